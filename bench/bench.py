@@ -0,0 +1,293 @@
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# The day modules aren't a package; put each directory on the path, and
+# the root for the intcode package
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+for day in ("day_2", "day_5", "day_7", "day_9", "day_11", "day_13"):
+    sys.path.insert(0, os.path.join(root, day))
+
+import intcode
+import day_2
+import day_5
+import day_7
+import day_9
+import day_11
+import day_13
+
+default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+class Workload:
+    # Something to time. run() is the workload itself; instructions() counts
+    # the Intcode instructions it executes, using the profiling VM in intcode.
+    name = None
+
+    def run(self):
+        pass
+
+    def instructions(self):
+        pass
+
+
+class FindInput(Workload):
+    name = "day_2 find_input"
+
+    def run(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return day_2.find_input(day_2.day_2_input.copy(), 19690720)
+
+    def instructions(self):
+        total = 0
+        for noun, verb in itertools.product(range(100), range(100)):
+            program = day_2.day_2_input.copy()
+            program[1] = noun
+            program[2] = verb
+            runner = intcode.OpCodeProcessor(program, profile=True)
+            runner.run()
+            total += runner.profile.instructions
+            if runner.opcodes[0] == 19690720:
+                return total
+
+
+class Diagnostics(Workload):
+    name = "day_5 diagnostics"
+    system_ids = (1, 5)
+
+    def run(self):
+        for system_id in self.system_ids:
+            stdin = sys.stdin
+            sys.stdin = io.StringIO(f"{system_id}\n")
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    day_5.OpCodeProcessor(day_5.day_5_input.copy())
+            finally:
+                sys.stdin = stdin
+
+    def instructions(self):
+        total = 0
+        for system_id in self.system_ids:
+            runner = intcode.OpCodeProcessor(day_5.day_5_input, inputs=[system_id], profile=True)
+            runner.run()
+            total += runner.profile.instructions
+        return total
+
+
+class HighestSignal(Workload):
+    def __init__(self, feedback):
+        self.feedback = feedback
+        self.name = "day_7 feedback" if feedback else "day_7 series"
+
+    def run(self):
+        return day_7.get_highest_signal(day_7.day_7_codes, self.feedback)
+
+    def instructions(self):
+        phases = range(5, 10) if self.feedback else range(5)
+        total = 0
+        for combo in itertools.permutations(phases):
+            amps = [intcode.OpCodeProcessor(day_7.day_7_codes, inputs=[phase], profile=True) for phase in combo]
+            signal = 0
+            while not amps[-1].complete:
+                for amp in amps:
+                    amp.inputs.append(signal)
+                    amp.run()
+                    signal = amp.outputs[-1]
+                if not self.feedback:
+                    break
+            total += sum(amp.profile.instructions for amp in amps)
+        return total
+
+
+class Boost(Workload):
+    name = "day_9 BOOST"
+
+    def run(self):
+        for mode in ("1", "2"):
+            intcode.OpCodeProcessor(day_9.day_9_codes, inputs=[mode]).run()
+
+    def instructions(self):
+        total = 0
+        for mode in (1, 2):
+            runner = intcode.OpCodeProcessor(day_9.day_9_codes, inputs=[mode], profile=True)
+            runner.run()
+            total += runner.profile.instructions
+        return total
+
+
+class Painter(Workload):
+    name = "day_11 run_robot"
+
+    def run(self):
+        day_11.RobotPainter(day_11.day_11_ops).run_robot()
+
+    def instructions(self):
+        # A recording counts instructions; one checkpoint at the start
+        painter = day_11.RobotPainter(day_11.day_11_ops, record=sys.maxsize)
+        painter.run_robot()
+        return painter.robot.processor.recording.instructions
+
+
+class Breakout(Workload):
+    def __init__(self, processor=intcode.OpCodeProcessor):
+        self.processor = processor
+        self.name = "day_13 game" if processor is intcode.OpCodeProcessor else f"day_13 game ({processor.__name__})"
+
+    def play(self, **kwargs):
+        game = day_13.day_13_ops.copy()
+        game[0] = 2
+        screen = day_13.GameScreen(game, processor=self.processor, **kwargs)
+        while screen.runner.complete is False:
+            screen.run_runner()
+            move = (screen.ball_x > screen.paddle_x) - (screen.ball_x < screen.paddle_x)
+            screen.runner.inputs.append(move)
+        return screen
+
+    def run(self):
+        return self.play().score
+
+    def instructions(self):
+        return self.play(record=sys.maxsize).runner.recording.instructions
+
+
+class Headless(Breakout):
+    def __init__(self, processor=intcode.OpCodeProcessor):
+        super().__init__(processor)
+        self.name = self.name.replace("game", "headless game")
+
+    def play(self, **kwargs):
+        game = day_13.day_13_ops.copy()
+        game[0] = 2
+        screen = day_13.Game(game, processor=self.processor, **kwargs)
+        screen.headless_game()
+        return screen
+
+
+workloads = [
+    FindInput(),
+    Diagnostics(),
+    HighestSignal(False),
+    HighestSignal(True),
+    Boost(),
+    Painter(),
+    Breakout(),
+    Breakout(intcode.CompiledProcessor),
+    Headless(),
+]
+
+
+def measure(workload, repeat=3):
+    # Best wall time of `repeat` runs, then one traced run for memory
+    wall = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        workload.run()
+        elapsed = time.perf_counter() - start
+        wall = elapsed if wall is None else min(wall, elapsed)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = workload.run()
+        after = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # Blocks the workload allocated and still held when it finished. This is
+    # not a count of every allocation it made: a release build of CPython
+    # keeps no running total of allocations, and tracemalloc only sees
+    # blocks that are still live when a snapshot is taken.
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    del result
+    instructions = workload.instructions()
+    return {
+        "wall": wall,
+        "instructions": instructions,
+        "instructions_per_second": instructions / wall if wall else 0,
+        "peak_memory": peak,
+        "retained_blocks": retained_blocks,
+    }
+
+
+def compare(results, baseline, threshold=0.2, block_slack=100):
+    # Names of workloads whose wall time, peak memory or retained blocks
+    # grew by more than `threshold` over the baseline. Retained blocks are
+    # small counts that move by a few between runs, so they must also grow
+    # by more than `block_slack` blocks to be flagged.
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        for key in ("wall", "peak_memory", "retained_blocks"):
+            if not before.get(key) or key not in result:
+                continue
+            if result[key] > before[key] * (1 + threshold):
+                if key == "retained_blocks" and result[key] - before[key] <= block_slack:
+                    continue
+                regressions.append((name, key, before[key], result[key]))
+    return regressions
+
+
+def report(results, baseline=None):
+    lines = [
+        "retained: blocks still allocated after a traced run. CPython keeps no total allocation count to report.",
+        f"{'workload':<32} {'wall s':>9} {'instr/s':>12} {'instructions':>13} {'peak KiB':>9} {'retained':>8} {'vs base':>8}",
+    ]
+    for name, result in results.items():
+        change = ""
+        if baseline and name in baseline and baseline[name]["wall"]:
+            change = f"{result['wall'] / baseline[name]['wall'] - 1:+.0%}"
+        lines.append(f"{name:<32} {result['wall']:>9.4f} {result['instructions_per_second']:>12,.0f} "
+                     f"{result['instructions']:>13,} {result['peak_memory'] / 1024:>9,.0f} {result['retained_blocks']:>8,} {change:>8}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every Intcode workload in the repo")
+    parser.add_argument("--baseline", default=default_baseline, help="JSON file to compare against / save to")
+    parser.add_argument("--save", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging, 0.2 = 20%%")
+    parser.add_argument("--only", action="append", help="run workloads whose name contains this")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    results = {}
+    for workload in workloads:
+        if args.only and not any(part in workload.name for part in args.only):
+            continue
+        results[workload.name] = measure(workload, args.repeat)
+    print(report(results, baseline))
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    regressions = compare(results, baseline or {}, args.threshold)
+    for name, key, before, after in regressions:
+        print(f"REGRESSION {name}: {key} {before:.4g} -> {after:.4g}")
+    return 1 if regressions else 0
+
+
+def test_compare():
+    baseline = {"a": {"wall": 1.0, "peak_memory": 100}, "b": {"wall": 1.0, "peak_memory": 100}}
+    results = {"a": {"wall": 1.1, "peak_memory": 100}, "b": {"wall": 1.5, "peak_memory": 100}, "c": {"wall": 9, "peak_memory": 9}}
+    assert compare(results, baseline) == [("b", "wall", 1.0, 1.5)]
+    baseline = {"a": {"wall": 1.0, "peak_memory": 100, "retained_blocks": 10}, "b": {"wall": 1.0, "peak_memory": 100, "retained_blocks": 100}}
+    results = {"a": {"wall": 1.0, "peak_memory": 100, "retained_blocks": 40}, "b": {"wall": 1.0, "peak_memory": 100, "retained_blocks": 400}}
+    assert compare(results, baseline) == [("b", "retained_blocks", 100, 400)]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
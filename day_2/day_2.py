@@ -1,133 +1,254 @@
-from abc import ABC, abstractmethod, abstractproperty
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repo root, see days.py
+import intcode
+from intcode import PagedMemory
+
+class BoundedMemory(PagedMemory):
+    # Day 2 memory is just the program: touching an address past its end is
+    # an IndexError rather than growing it
+    def read(self, address):
+        if address >= len(self.dense):
+            raise IndexError(f"address {address} is outside the program")
+        return super().read(address)
+
+    def write(self, address, data):
+        if address >= len(self.dense):
+            raise IndexError(f"address {address} is outside the program")
+        super().write(address, data)
+
+
+class OpCodeProcessor(intcode.OpCodeProcessor):
+    # Day 2 programs run as soon as they are built, unless runself is off to
+    # keep one paused for forking
+    def __init__(self, opcodes, runself=True, **kwargs):
+        super().__init__(opcodes, **kwargs)
+        self.memory = BoundedMemory(self.memory.dense)
+        if runself:
+            self.run()
+
+
+def run_attempt(start, noun, verb):
+    # Output of the paused program start with noun and verb filled in, run
+    # on a fork so start itself is left as it was
+    attempt = start.fork()
+    attempt.set_value(1, noun)
+    attempt.set_value(2, verb)
+    attempt.run()
+    return attempt.opcodes[0]
 
 def intcode(opcodes: list):
-    position = 0
-    while position < len(opcodes):
-        if opcodes[position] == 99:
-            return opcodes
-        elif opcodes[position] == 1:
-            digit_1 = opcodes[opcodes[position + 1]]
-            digit_2 = opcodes[opcodes[position + 2]]
-            output = opcodes[position + 3]
-            opcodes[output] = digit_1 + digit_2
-            position = position + 4
-            continue
-        elif opcodes[position] == 2:
-            digit_1 = opcodes[opcodes[position + 1]]
-            digit_2 = opcodes[opcodes[position + 2]]
-            output = opcodes[position + 3]
-            opcodes[output] = digit_1 * digit_2
-            position = position + 4
-            continue
-        else:
-            print("Unknown opcode")
-            position += 1
-    pass
-class OpCode(ABC):
-    
-    def __init__(self, opcodes, current_position):
-        if opcodes[current_position] != self.my_opcode:
-            print(f"Opcode: {opcodes} Position:{current_position}")
-            raise Exception("Bad Opcode")
-        self.opcodes = opcodes
-        self.should_continue = True
-        self.position = current_position
-        self.operation()
-    
-    @abstractproperty
-    def my_opcode(self):
-        pass
-    
-    @abstractmethod
-    def operation(self):
-        pass
+    # Runs the program and writes the final memory back into opcodes
+    opcodes[:] = OpCodeProcessor(opcodes).opcodes
+    return opcodes
 
-class OpCode1(OpCode):
-    @property
-    def my_opcode(self):
-        return 1
-
-    def operation(self):
-        opcodes = self.opcodes
-        position = self.position
-        digit_1 = opcodes[opcodes[position + 1]]
-        digit_2 = opcodes[opcodes[position + 2]]
-        output = opcodes[position + 3]
-        opcodes[output] = digit_1 + digit_2
-        self.position = position + 4
-        self.opcodes = opcodes
-
-class OpCode2(OpCode):
-    @property
-    def my_opcode(self):
-        return 2
-
-    def operation(self):
-        opcodes = self.opcodes
-        position = self.position
-        digit_1 = opcodes[opcodes[position + 1]]
-        digit_2 = opcodes[opcodes[position + 2]]
-        output = opcodes[position + 3]
-        opcodes[output] = digit_1 * digit_2
-        self.position = position + 4
-        self.opcodes = opcodes
-    
-class OpCode99(OpCode):
-    @property
-    def my_opcode(self):
-        return 99
-
-    def operation(self):
-        self.should_continue = False
-
-class OpCodeProcessor:
-    opcode_runners = {
-        1: OpCode1,
-        2: OpCode2,
-        99: OpCode99
-    }
-    def __init__(self, opcodes):
-        self.position = 0
-        self.opcodes = opcodes
-        while self.position < len(self.opcodes):
-            code = self.opcodes[self.position]
-            runner = self.opcode_runners[code]
-            op = runner(self.opcodes, self.position)
-            self.opcodes = op.opcodes
-            self.position = op.position
-            if op.should_continue is False:
-                return
-                
 def test_intcode():
     assert intcode([1,0,0,0,99]) == [2,0,0,0,99]
     assert OpCodeProcessor([2,3,0,3,99]).opcodes == [2,3,0,6,99]
     assert intcode([2,4,4,5,99,0]) == [2,4,4,5,99,9801]
     assert intcode([1,1,1,4,99,5,6,0,99]) == [30,1,1,4,2,5,6,0,99]
     assert OpCodeProcessor([1,0,0,0,99]).opcodes == [2,0,0,0,99]
+    try:
+        intcode([1,9,0,0,99])
+    except IndexError:
+        pass
+    else:
+        assert False
+
+def test_search_nouns_out_of_range():
+    program = [1,0,0,0,99,5,6]
+    # Noun 7 reads past the end, which must not count as a 0 there
+    assert search_nouns(program, 5, [7], [5]) is None
+    assert search_nouns(program, 11, [7, 5], [6]) == (5, 6)
 
 
 def find_input(opcodes, desired_output):
     output = 0
-    og_opcodes = opcodes.copy()
+    start = OpCodeProcessor(opcodes, runself=False)
     a = 0
     counter=0
     while a <= 99:
         b = 0
         while b <= 99:
             counter += 1
-            opcodes[1] = a
-            opcodes[2] = b
-            output = intcode(opcodes)[0]
+            output = run_attempt(start, a, b)
             print(output)
             if output == desired_output:
                 return a, b
-            opcodes = og_opcodes.copy()
             b += 1
         a += 1
     print(counter)
     raise Exception("No Vals Found")
 
 
+def search_nouns(opcodes, desired_output, nouns, verbs):
+    # Worker for find_input_parallel: first match within these nouns
+    start = OpCodeProcessor(opcodes, runself=False)
+    for noun in nouns:
+        for verb in verbs:
+            try:
+                output = run_attempt(start, noun, verb)
+            except IndexError:
+                # Noun or verb pointed outside the program
+                continue
+            if output == desired_output:
+                return noun, verb
+    return None
+
+
+def find_input_parallel(opcodes, desired_output, nouns=range(100), verbs=range(100), workers=None, chunk_size=4):
+    # Same answer as find_input (lowest noun, then verb) but with the nouns
+    # split into chunks across a process pool
+    chunks = [nouns[i:i + chunk_size] for i in range(0, len(nouns), chunk_size)]
+    found = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(search_nouns, opcodes, desired_output, chunk, verbs): index
+            for index, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            index = futures[future]
+            result = future.result()
+            if result is None:
+                continue
+            found[index] = result
+            # Later chunks can't beat this one; earlier ones still might
+            for other, other_index in futures.items():
+                if other_index > index:
+                    other.cancel()
+    if not found:
+        raise Exception("No Vals Found")
+    return found[min(found)]
+
+
+class SymbolicFallback(Exception):
+    pass
+
+
+class Polynomial:
+    # Integer polynomial in noun and verb, {(noun_power, verb_power): coefficient}
+    def __init__(self, terms):
+        self.terms = {powers: c for powers, c in terms.items() if c != 0}
+
+    @classmethod
+    def constant(cls, value):
+        return cls({(0, 0): value})
+
+    @property
+    def is_constant(self):
+        return all(powers == (0, 0) for powers in self.terms)
+
+    @property
+    def value(self):
+        return self.terms.get((0, 0), 0)
+
+    def __add__(self, other):
+        terms = dict(self.terms)
+        for powers, c in other.terms.items():
+            terms[powers] = terms.get(powers, 0) + c
+        return Polynomial(terms)
+
+    def __mul__(self, other):
+        terms = {}
+        for (n1, v1), c1 in self.terms.items():
+            for (n2, v2), c2 in other.terms.items():
+                powers = (n1 + n2, v1 + v2)
+                terms[powers] = terms.get(powers, 0) + c1 * c2
+        return Polynomial(terms)
+
+    def in_verb(self, noun):
+        # Coefficients of the polynomial in verb once noun is fixed
+        coefficients = {}
+        for (n, v), c in self.terms.items():
+            coefficients[v] = coefficients.get(v, 0) + c * noun ** n
+        return coefficients
+
+    def __repr__(self):
+        return " + ".join(f"{c}*n^{n}*v^{v}" for (n, v), c in sorted(self.terms.items())) or "0"
+
+
+def symbolic_intcode(opcodes: list):
+    # One run with noun and verb left symbolic. A read through a symbolic
+    # address gives None, which is fine as long as nothing needs its value.
+    memory = [Polynomial.constant(value) for value in opcodes]
+    memory[1] = Polynomial({(1, 0): 1})
+    memory[2] = Polynomial({(0, 1): 1})
+
+    def concrete(position):
+        cell = memory[position]
+        if cell is None or not cell.is_constant:
+            raise SymbolicFallback(f"Symbolic value needed at {position}")
+        return cell.value
+
+    position = 0
+    while position < len(memory):
+        code = concrete(position)
+        if code == 99:
+            return memory
+        if code not in (1, 2):
+            raise SymbolicFallback(f"Opcode {code} at {position}")
+        values = []
+        for address in memory[position + 1:position + 3]:
+            if address is None or not address.is_constant:
+                values.append(None)
+            else:
+                values.append(memory[address.value])
+        target = concrete(position + 3)
+        if None in values:
+            memory[target] = None
+        elif code == 1:
+            memory[target] = values[0] + values[1]
+        else:
+            memory[target] = values[0] * values[1]
+        position += 4
+    raise SymbolicFallback("Ran off the end of the program")
+
+
+def solve_input(opcodes, desired_output, nouns=range(100), verbs=range(100)):
+    # Solves output[0] == desired_output from a single symbolic run, falling
+    # back to search_nouns when the program can't be run symbolically
+    try:
+        output = symbolic_intcode(opcodes)[0]
+    except (SymbolicFallback, IndexError):
+        output = None
+    if output is None:
+        result = search_nouns(opcodes, desired_output, nouns, verbs)
+        if result is None:
+            raise Exception("No Vals Found")
+        return result
+    for noun in nouns:
+        coefficients = output.in_verb(noun)
+        if max(coefficients, default=0) > 1:
+            candidates = verbs
+        elif coefficients.get(1, 0) == 0:
+            candidates = verbs if coefficients.get(0, 0) == desired_output else []
+        else:
+            verb, remainder = divmod(desired_output - coefficients.get(0, 0), coefficients[1])
+            candidates = [verb] if remainder == 0 and verb in verbs else []
+        for verb in candidates:
+            # Confirm concretely; a dead read through noun or verb can still
+            # fall outside the program
+            if search_nouns(opcodes, desired_output, [noun], [verb]) is not None:
+                return noun, verb
+    raise Exception("No Vals Found")
+
+
+def test_find_input_parallel():
+    assert find_input_parallel(day_2_input, 19690720) == (48, 47)
+    assert find_input_parallel(day_2_input, 19690720, nouns=range(40, 160), workers=2) == (48, 47)
+
+
+def test_solve_input():
+    assert symbolic_intcode(day_2_input)[0].terms == {(0, 0): 250673, (1, 0): 405000, (0, 1): 1}
+    assert solve_input(day_2_input, 19690720) == (48, 47)
+    # Noun and verb used as addresses: falls back to brute force
+    assert solve_input([1,0,0,0,99,10,20], 30, nouns=range(7), verbs=range(7)) == (5, 6)
+
+
 day_2_input = [1,0,0,3,1,1,2,3,1,3,4,3,1,5,0,3,2,9,1,19,1,5,19,23,2,9,23,27,1,27,5,31,2,31,13,35,1,35,9,39,1,39,10,43,2,43,9,47,1,47,5,51,2,13,51,55,1,9,55,59,1,5,59,63,2,6,63,67,1,5,67,71,1,6,71,75,2,9,75,79,1,79,13,83,1,83,13,87,1,87,5,91,1,6,91,95,2,95,13,99,2,13,99,103,1,5,103,107,1,107,10,111,1,111,13,115,1,10,115,119,1,9,119,123,2,6,123,127,1,5,127,131,2,6,131,135,1,135,2,139,1,139,9,0,99,2,14,0,0]
 day_2_pt_1_input = day_2_input.copy()
 day_2_pt_1_input[1] = 12
@@ -135,6 +256,6 @@ day_2_pt_1_input[2] = 3
 if __name__ == "__main__":
     output_pt_1 = intcode(day_2_pt_1_input)
     print(f"Part 1: {output_pt_1[0]}")
-    day_2_noun, day_2_verb = find_input(day_2_input, 19690720)
+    day_2_noun, day_2_verb = solve_input(day_2_input, 19690720)
     day_2_answer = 100 * day_2_noun + day_2_verb
     print(f"Part 2: {day_2_answer}")
\ No newline at end of file
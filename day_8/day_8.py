@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
 
 from collections import Counter
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # repo root, see days.py
+from days import lazy_inputs, read_text
 
 class SIFFile:
     def __init__(self, sif_data):
@@ -77,7 +82,7 @@ class SIFLayer:
 
 
 def find_least_zeros(text_input, width, height):
-    f = SIFFile(main_input)
+    f = SIFFile(text_input)
     f.format_shape(width, height)
     least_zeros = None
     count_zeros = f.layers[0].number_of_character("0")
@@ -90,9 +95,15 @@ def find_least_zeros(text_input, width, height):
     return least_zeros
 
 
-main_input = "221221212220222221022220222220222022022220222222220222021222222222222222212222022222222222222222220220222122222022220212202222212222220222222222222222222220112221222222222221222222222022022221222222222222022222222222222222222222022222222222222222222221222022222122220222222222202222221222222222222220220220112222222222022222122212222122022220212222221222120222222222222222222222222222222222222222220220222222222022221222222222222222220222222222222222222221002222222221122222122200222222122221212222220222021222222222222222212222022222222222222222221222222122222122220202212222212222221222222222222220220222012220222220022222022221222022022222222122222222020222222222222222222222022222222222222222221222222122222022222202212222212222220222222222222222222221012220222222022221122220222122222220222022221222222222222222222222222222222222222222222222221222222122222022222202212022202222221222222222222220222221012220222222122221022201222022222222222122220222021222222222222222222022022222222222222222220220222022222022222222222122102222220222222222222222222220212220222222222220022211222122122222212022221222022222222222222222212222222222222222222222221222222122222222222212202122022222222222222222222222222222002221222221122222022221222222222220222022220222222222222222222222212222122222222222222222222022222122222222221222202122122222221222222222222220220222202221222222222222222202222122022220212122220222021222222222222222222122122222222222222222221222222022222022222202212122222222220222222222222220222221102222222222022221222211222222022220212222222222222222222222222222212022122222222222220222220021222122222122220222212222012222220222222222222221222221012022222221222221122201222122222222202122222222121222222222222222202222122222222222221222221220222122222122221212212022112222222222222222222221222221212220222222222222122211222122222222202222220222122222222222222222212022222202212222222222222021222022222222221202222122122222221222222222222220222221122121222220122222122222222222022222222122221222021222222222222222222122022212212222221222220021222122222222222022202022202222221222222222222222222222212021222221022222122202222122122220202222222222222222222222222222222122222222202222221222222221222222222122221202222022222222220222222222222221221221222122222221022220022201222221122220212022221222221222222222222222212122122222202222220222220122222022222222220102222022112222222222222222222222222220022120222222122221222222222021122220222022220222122222222222212222202222022202222222221222222122222022222222222022212022022222222222222222222221222222022122222222222221122220222220122222222022220222221122222222202222202222122212212222222222220022222122222222222012212022022222220222222222222220221222012120222220122220122211222022022220212022021222022022222222212222222122222222222222221222221020222222222122221002202122102222221222222222222221221221122222222210222222022222222122222220212122120222222122222222202222222122222202212222221222222220222222222222222002222222012222221222222222222221221221002221222202222221222201222200022221202122221222120202222222202222212122222202202222220220220122222222222122220022202022212222222222222222222220222221222122222221222222022222222010122220202022021220220022222222212222222222222202212222221221222222222122222222222122222122112222222222222222222221220221212222222210122221122222222000102221222022022222120202222222212222222022122202222222220222221020222022222122222202202022122222220222222222222220220221012220222202022220222201222201212222222122220222021202222222222222212222122222222222221221222121222122222022222012212122212222221222222222222220220222012022222221122221222210222001002221212222020220020002222222212222222222222222222222220221220221222222222022021022212222112222222222222222222221220220022022222221022221222212122200122221222222020221121202222222202222222122022202202222221222222121222022222222220222202222202222220222222222222220221221022121222202222220222210122022122221212122221221221202222222212222212022222222222222222220220022222222222122221112202222012222221222222222222222221222022220222211122222122221222221102221212122020220120012222222222222222122222222222222220221221121222022222222220222212222122222220222222222222221221220112120222220122221222201022221122022202122122222122222222222202222202222222222022222221221222020222122222022122022202122022222221222222222222221222222212021222210122220022211122112122122212022021221020212222222222222222122122212112222221222220022222222222222020222222122012222222222222222222222220221202022222221222221022220022110222021222222120220120112222222202222212222222222212222220220220020222022222222021112222122202222221222222222222222221221202022222212122220022200222010112120212222222220020002222222202222202122022212212222222220220021222022222022020102202222122222220222222222222220222222222020222220022222222221222200202122222122121221221102222222202222222122022212122222221222222022222122222222122112202222202222221222222222222221221221212121222222222222122221222121012121202122022221222102222222222222222022022202012222221222222120222222222122021022202022012222222222222222222221222221212220222212122220022020122111122222202222220222222212222222212222212122222222212222220221222222222222222022221112222222122222220222222222222222220220002220222211022221122121022021022121222022121222211112222222202222212222222222212222220222222122222122222022221022222022122222220222222222222220220220122021222222022221122010222111212021202122121221110002222222222222212022122202022222222222222021222022222222122212202122022222222222222222222222221221212220222220222221022221022122222120222022021222220022222222202222212022022222122222220221222122222022222222220022202222102222220222222222222221220220112121222222221221122000222022212122222022122220120202222222222222212122022222002222221220222220222022222222221102222222102222221222222222222221220220022122222200121222022121022102102020202122221222220222222222222202202122022202112222222222222021222222222102120222222122202222220222222222222220221222112120222221022222222001122021202021222222021221100122222222222222212222022202222222222220221222222122222202221200212122112222221222222222222222211220012222222111221221022222022022222121222222120220012222222222202222212022022212102222221220221121222122222202022021222022022222222222222222222201220221022220222120121220022101122212222122212022120220212022222222202222212222222212122222220221222120222022222122021110222122112222221222222222222201220221222020222201221221022221022011222022222022222222120202222222212222202022022202222222220221021222222022222102220020222222222222200222222222222222200222102020222200220222122001022110002120202022122221221212222222212222212222222212122222220222122020222222222112220120202222012222212222222222222211221221202122222101121222222202022222202022222122222222021102222222202222202222022202012222221222220121222122222212022200202222022222200222222222222221200222222021222211220221222222022212202020212122020222202212222222212212202122222222222220222221121120222222222102220121202122001222210222222222222210200221222120222122022220022222122120002022202122121222000202222222212212202022222212112221221220121122222022222002221100222222121222210222222222222200200122112022222000122221122122002212022121212222021220010112222222222212202022222222212222222220122022222122222202122121212122111222211222222222222210200020222121222100021222022021102021112122212122020222020222222222212222222022022222022222220221120222222222022212121101212022212222202222222222222211212021212122222211220220222121122122122020212122220221210212122022202212222122022202012221222120121222222122122212220121202122102222221222222222222210220120202022222200122221122110202021002021222122022221222012122022222212202122222222102220221222022022222022222212221200202222020222220221222222222200211022112220222001220222222100102002002122222122222221101022122022202212222122022212202222221022021021222022122222121122222222020222201222222222222221201221002222222001120221222202112220102120222222222222202112222022222202222212122212102220222021221120222022222112022122212222110222201221222222222220202022202222222201022222222122222202012020202122020222012012022122222202222022022202012220221022222121222022122002022120222122121222211120222222222222200120212020222212222222222010112020112020222222020222102112222222202202220202122212012222222121120020222122022202021211222022202222201220222222222222200020002221222021221220122001022010002121212222121221010202222122222212212012222210102220222021122121222022022122122100212122000222222221222222222212200220122022222222120221122221202001212222202122121222120112222222212222200222122202022222222121122020222122122102022210222122120222211221222212222211212222222022222002122220022112222100012222202122220222010122022222202212211222122211102222222120121021222222022122221212212222021222211122222222222221221222212222222010120221222222122201212222202022021222002022022122202212200012122211102220221120022020220022022002020122222022222222210121222222222210221222012120222122222221122000202100222022222222021221001112022222222202222002022202122221221222022121221022122002022011202022102222200020222222222222210020221020222212121222022022112022002220212222021212021112222022202022201002222222102220220200021220222222222122021120202022222222222221222212222202212100121222222222022220222002112001012220222222021221222102222122202122220212022201112222220002021121221222122002020220212222211222201121222202222201222002002011222110001222122222212220002221202222122200110222122122202222201212122212210222220220021220220022222122110220212122000222222121222212222221211010212021222122021221122210222200222022222222122200121122222022212022222122122201012220122222120020222122222112111021202222002222201020221202222221200201000202222102000222222012112120122121202222222221021200022022212022201102022222210220021221020221220022222112000200222022021222200022222222222202201122210010222220212220022010220200112020222222122211101012122222222212202202222200020222021201022120222022222212122012212022122222210220222202222212200200120010222110211221222110211202222120202022020201200200222122222202222002122210120222201112122121221022022222011212212222201222210020221200222221221011201021222221200221022222002010020020212122021211012222022022212022211122022212000222112200122221220222222102101012212022122222211220222212222202212221202012222010021222022221021100212021202122221221221101022222222212210000222220222220000201121022221022222122212121202122120222210120220220222212202021010111222111121221022002201100200222202222021212210211222022212102211120122200212222001020221221220222122200022212222222101222211021100210222202221020201120222220022222222201210122120121202022222212010110122022202222220200022201220222120201221121220022222222210210212022110222211221200221222202200122220000222100201221222122211211101020222222120220001112122022202122201100222212212220112211020122221122122102202101202222201222211022101210222200220120020102222112121221122000122010000120212022221201202002022222222222222012022211022222120122121221221022022112102010212222201222211021002211222212212002102200222110210221022212210220101121222122121201122211222122222012201010122211200221122102222120222222022211020002212122202220202121110202022200220102022020222201022222220100011102201022222022022200200221022202212022211122022212211222121121021222222222122220100220202022012221212222102222022220222020012221222220112222220012210112110022212122220220222120222202212212220002022221000021020102121221222222222120221102222022100221200222112200222221220011110022022111202021220202201101010122222222222201221212222202222012210212022200011000211010121121221022222021120011222122211220210220201210122202210000000102122200222222120001122121201022222222222221212011022202222002201120022200202100111002222020220022022202112021212022012221210211102200122212200201101221122201012021121221112220100221222222122201110022022002212002202200022220112101110101021220221222222020112110212222221221222012202202222202221100221100122220120021021200222100102220212022120012000021022222222102211120122221101122102210021122220122222101210100222122111221201011120222022200201212202020122221021220220200210200011121202222222120022102122102202202202212122200122120120012221020222022122110101021222222201220221022101202202211201222212010222122000021020001021011201022202222122201010010222112202212210012122021221012021220222120221122122201101001212022200221221011201221212212220202021012022001020022121012022001021220202122120000201101022011222022211001222112112112002200222220222222122120012120222122222221210211101211122220200022000110122120100020021121002002100122202222122110101102022010212012201100222211112102201110122021222122122011121101221022112221211211121221112210201211202012222020200120221202011211111020202022221020122101222211222102220200222202110102120220021020221222022221222010220022022220201120102200222220201120101200022022211222222201020102111021202122220200010222222012202002201200222210110212221202221220220022022102112202210022002220201220110220202222201201021212022111222221220202111101102222202222120110120120222200202202222021022210201211210022220220220122022120201200221122101221201121102202012211201021122210222021201020122012121022211221222022021120211010222020220112220102122201000121022012121021222222122011120002202022021220000222011211002201221012112101122120021121021222211120021022222022121102120010022100220102201022022202210002011001222121221122221221110201202122012221002210102202222222212102112202222022200120220211022000211120212122020010202021122121202202221220022010122120011112120122222122021212200021222221211220000122101201122221221211122121122201112120020210100210211222202022122010110212222220202202210112022011002210200222021221022022020122100221200020201221200010011200002200212012121100022222012221122010100022101020202122220022111012022120210022211102122122022012002122021220120022122020102212202022102220102201100200002221211012002200022101211222122202121110201022222022121100200100222110210222210010122002221020011221222220220022021111111022211220122220102112000202102222222110221000022020011021220121102121211222222122022022001120122201220122221011122222121010110111120122022022222022011022212022222222200102200201202201200201000212022102201022220221211110001222222122122222112112022000222022212010122110222001210210221111121022200221001112211020002220210101100200202221211220022022022110111220122222020221202221222122122012121201122220211022210020022221220202202110022012222122011201002112220121111221002210010212012201200202001011022102112021122101002112201211202022220000110021022020221102202210122121202121001012021100221122222220201010222222200221001201110101012221201011012101122011010102220211220211011221212122222110002202222202211002202120122020201211111100122012120022100222201110222121102222021000100112222200112120101101000111110121200102202222122011010100112201021120100201100121001201101021212002111000210220102000110020211222000201000010001002101201010102"
+# Puzzle input, read on first use as day_8.main_input or
+# load_input("main_input"). DAY_8_INPUT (or inputs) points it at another
+# file.
+inputs = {"main_input": ("day_8_input.txt", "DAY_8_INPUT", read_text)}
+load_input = lazy_inputs(globals(), inputs)
+__getattr__ = load_input
 
 if __name__ == "__main__":
+    main_input = load_input("main_input")
     f = find_least_zeros(main_input, 25, 6)
     pt_1 = f.number_of_character("1") * f.number_of_character("2")
     print(f"Part 1 answer is {pt_1}")
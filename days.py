@@ -0,0 +1,51 @@
+import copy
+import os
+
+# Plumbing shared by the day modules. Each day directory is run as a script
+# or collected by pytest on its own, so a day module puts the repo root on
+# sys.path with a single line before importing this module or the intcode
+# package; that line is the one piece that can't be shared from here.
+
+
+def read_text(path):
+    with open(path) as f:
+        return f.read().strip()
+
+
+def lazy_inputs(namespace, inputs):
+    # Puzzle inputs read on first use. inputs maps a name to (file next to
+    # the module, environment variable that overrides the path, parser), and
+    # namespace is the module's globals(), where each value is cached.
+    # The returned load_input(name) hands out a copy; reading the module
+    # attribute gives the cached value itself, so copy it before mutating.
+    directory = os.path.dirname(os.path.abspath(namespace["__file__"]))
+
+    def load_input(name):
+        if name not in inputs:
+            raise AttributeError(f"module {namespace['__name__']!r} has no attribute {name!r}")
+        if name not in namespace:
+            filename, variable, parse = inputs[name]
+            namespace[name] = parse(os.environ.get(variable, os.path.join(directory, filename)))
+        return copy.copy(namespace[name])
+
+    return load_input
+
+
+def test_lazy_inputs(tmp_path, monkeypatch):
+    (tmp_path / "numbers.txt").write_text("1,2,3\n")
+    namespace = {"__file__": str(tmp_path / "day_0.py"), "__name__": "day_0"}
+    parse = lambda path: [int(value) for value in read_text(path).split(",")]
+    load_input = lazy_inputs(namespace, {"numbers": ("numbers.txt", "DAY_0_INPUT", parse)})
+    numbers = load_input("numbers")
+    numbers.append(4)
+    assert load_input("numbers") == namespace["numbers"] == [1, 2, 3]
+    (tmp_path / "other.txt").write_text("5")
+    monkeypatch.setenv("DAY_0_INPUT", str(tmp_path / "other.txt"))
+    del namespace["numbers"]
+    assert load_input("numbers") == [5]
+    try:
+        load_input("letters")
+    except AttributeError:
+        pass
+    else:
+        assert False
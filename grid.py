@@ -0,0 +1,234 @@
+from array import array
+import sys
+import time
+
+# The cell grid and terminal renderer behind day 11's hull and day 13's
+# screen
+
+
+class Grid:
+    # Cell codes for a rectangle of the plane in a row-major bytearray, with
+    # an unsigned int array counting how often each cell was assigned (a
+    # byte would wrap at 255 repaints). Covers x in [left, left + columns)
+    # and y in [bottom, bottom + rows); reaching outside doubles the covered
+    # size along that axis.
+    def __init__(self, left, bottom, columns, rows):
+        self.left = left
+        self.bottom = bottom
+        self.columns = columns
+        self.rows = rows
+        self.cells = bytearray(columns * rows)
+        self.counts = array("I", bytes(4 * columns * rows))
+        # Set of (x, y) assigned since a TerminalRenderer last drew
+        self.dirty = None
+
+    def index(self, x, y):
+        column = x - self.left
+        row = y - self.bottom
+        if column < 0 or row < 0 or column >= self.columns or row >= self.rows:
+            self.grow(x, y)
+            column = x - self.left
+            row = y - self.bottom
+        return row * self.columns + column
+
+    def grow(self, x, y):
+        left, columns = self.left, self.columns
+        while x < left:
+            left -= columns
+            columns *= 2
+        while x >= left + columns:
+            columns *= 2
+        bottom, rows = self.bottom, self.rows
+        while y < bottom:
+            bottom -= rows
+            rows *= 2
+        while y >= bottom + rows:
+            rows *= 2
+        shift = (self.bottom - bottom) * columns + self.left - left
+        for name, empty in (("cells", bytearray), ("counts", lambda size: array("I", bytes(4 * size)))):
+            old = getattr(self, name)
+            grown = empty(columns * rows)
+            for row in range(self.rows):
+                start = row * columns + shift
+                grown[start:start + self.columns] = old[row * self.columns:(row + 1) * self.columns]
+            setattr(self, name, grown)
+        self.left, self.columns, self.bottom, self.rows = left, columns, bottom, rows
+
+    def __getitem__(self, position):
+        return self.cells[self.index(*position)]
+
+    def assign(self, x, y, code):
+        index = self.index(x, y)
+        self.cells[index] = code
+        self.counts[index] += 1
+        if self.dirty is not None:
+            self.dirty.add((x, y))
+
+    def row(self, y, start, stop):
+        # Codes for x in [start, stop] on row y
+        self.index(stop, y)
+        begin = self.index(start, y)
+        return self.cells[begin:begin + stop - start + 1]
+
+    @property
+    def assigned(self):
+        return len(self.counts) - self.counts.count(0)
+
+
+class Cell:
+    # One grid cell, standing in for the Panel/Tile object that used to be
+    # stored there
+    def __init__(self, grid, kind, x, y):
+        self.grid = grid
+        self.kind = kind
+        self.x = x
+        self.y = y
+
+    @property
+    def code(self):
+        return self.grid[self.x, self.y]
+
+    def assign(self, attribute):
+        self.grid.assign(self.x, self.y, self.kind.code_of(attribute))
+
+    def paint(self, color):
+        self.assign(color)
+
+    @property
+    def painted_count(self):
+        return self.grid.counts[self.grid.index(self.x, self.y)]
+
+    @property
+    def painted(self):
+        return self.painted_count > 0
+
+    @property
+    def as_int(self):
+        return self.code
+
+    @property
+    def as_str(self):
+        return self.kind.chars[self.code]
+
+    color = as_str
+
+    def __repr__(self):
+        return self.as_str
+
+
+class GridView:
+    # map_grid[y][x] access over a Grid, limited to the owner's width/height
+    def __init__(self, owner, y=None):
+        self.owner = owner
+        self.y = y
+
+    def span(self, size):
+        return range(0 - size if self.owner.negatives else 0, 1 + size)
+
+    def __contains__(self, key):
+        return key in self.span(self.owner.height if self.y is None else self.owner.width)
+
+    def __iter__(self):
+        return iter(self.span(self.owner.height if self.y is None else self.owner.width))
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if self.y is None:
+            return GridView(self.owner, key)
+        return Cell(self.owner.grid, self.owner.empty_type, key, self.y)
+
+    def values(self):
+        return [self[key] for key in self]
+
+
+def render_table(chars):
+    # bytes.translate table turning cell codes into their characters
+    return bytes.maketrans(bytes(range(len(chars))), chars.encode())
+
+
+class TerminalRenderer:
+    # Draws a Map-like owner (grid, width, height, negatives, empty_type) to a
+    # terminal once, then only repaints the cells assigned since the last
+    # frame using ANSI cursor moves. frame() drops frames to stay under `fps`;
+    # skipped changes are kept for the next one that is drawn.
+    def __init__(self, owner, flip=False, out=None, fps=30):
+        self.owner = owner
+        # Draw y growing downwards, as the game screen is
+        self.flip = flip
+        self.out = out or sys.stdout
+        self.interval = 1 / fps if fps else 0
+        self.last = None
+        self.extents = None
+        # Line shown under the grid, and characters drawn over it by
+        # position (the robot)
+        self.status = ""
+        self.overlays = {}
+        self.shown_status = None
+        self.shown_overlays = {}
+        owner.grid.dirty = set()
+
+    def bounds(self):
+        owner = self.owner
+        left = 0 - owner.width if owner.negatives else 0
+        bottom = 0 - owner.height if owner.negatives else 0
+        return left, bottom, owner.width, owner.height
+
+    def cursor(self, x, y):
+        left, bottom, right, top = self.bounds()
+        line = y - bottom + 1 if self.flip else top - y + 1
+        return f"\x1b[{line};{x - left + 1}H"
+
+    def frame(self, force=False):
+        now = time.perf_counter()
+        if not force and self.last is not None and now - self.last < self.interval:
+            return False
+        self.last = now
+        grid = self.owner.grid
+        chars = self.owner.empty_type.chars
+        left, bottom, right, top = self.bounds()
+        parts = []
+        if (right, top) != self.extents:
+            # First frame, or the map grew: draw everything
+            self.extents = (right, top)
+            table = render_table(chars)
+            rows = range(bottom, top + 1) if self.flip else range(top, bottom - 1, -1)
+            parts.append("\x1b[2J\x1b[H")
+            for y in rows:
+                parts.append(grid.row(y, left, right).translate(table).decode())
+                parts.append("\n")
+            self.shown_overlays = {}
+            self.shown_status = None
+        else:
+            for x, y in grid.dirty:
+                parts.append(self.cursor(x, y) + chars[grid[x, y]])
+            for x, y in self.shown_overlays:
+                if (x, y) not in self.overlays:
+                    parts.append(self.cursor(x, y) + chars[grid[x, y]])
+        grid.dirty.clear()
+        for (x, y), text in self.overlays.items():
+            if left <= x <= right and bottom <= y <= top:
+                parts.append(self.cursor(x, y) + text)
+        self.shown_overlays = dict(self.overlays)
+        if self.status != self.shown_status:
+            parts.append(f"\x1b[{top - bottom + 2};1H\x1b[2K{self.status}")
+            self.shown_status = self.status
+        parts.append(f"\x1b[{top - bottom + 3};1H")
+        self.out.write("".join(parts))
+        self.out.flush()
+        return True
+
+
+def test_grid():
+    grid = Grid(0, 0, 2, 2)
+    grid.assign(1, 1, 3)
+    grid.assign(-3, 5, 1)
+    assert (grid.left, grid.columns) == (-6, 8)
+    assert (grid.bottom, grid.rows) == (0, 8)
+    assert grid[1, 1] == 3 and grid[-3, 5] == 1 and grid[0, 0] == 0
+    assert grid.assigned == 2
+    for _ in range(300):
+        grid.assign(1, 1, 2)
+    grid.assign(9, 9, 1)
+    assert grid.counts[grid.index(1, 1)] == 301
+    assert grid.assigned == 3
@@ -0,0 +1,21 @@
+# The Intcode machine shared by the day modules. OpCodeProcessor is the
+# interface; engines maps names to the interchangeable implementations.
+from .amplifiers import Amplifier, AmplifierNetwork, AmplifierRunner, SeriesSweep, get_highest_signal, get_highest_signal_parallel, highest_in, sweep_networks
+from .batch import BatchEngine, BatchProcessor, run_batch
+from .compiled import CompiledProcessor
+from .engines import engines, get_engine, register_engine
+from .loader import load_program, read_cached_program, write_cached_program
+from .memory import Channel, PagedMemory
+from .opcodes import OpCode, OpCode1, OpCode2, OpCode3, OpCode4, OpCode5, OpCode6, OpCode7, OpCode8, OpCode9, OpCode99
+from .processor import ImmediateProcessor, OpCodeProcessor, Recording, ReferenceProcessor
+from .profile import Profile
+
+# The analyzer is only wanted by tooling, so it is imported on first access
+# rather than with every day module
+lazy = {"Analysis": "analysis", "Instruction": "analysis", "analyze": "analysis"}
+
+def __getattr__(name):
+    if name not in lazy:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    return getattr(import_module(f".{lazy[name]}", __name__), name)
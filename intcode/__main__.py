@@ -0,0 +1,7 @@
+# python -m intcode program.txt [--json] prints the static analysis
+import sys
+
+from .analysis import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import itertools
+
+from .processor import OpCodeProcessor
+
+class Amplifier(OpCodeProcessor):
+    def __init__(self, opcodes, phase, prev_output=None, **kwargs):
+        self.phase = phase
+        inputs = [phase]
+        if prev_output != None:
+            inputs.append(prev_output)
+        super().__init__(opcodes, inputs=inputs, **kwargs)
+    
+
+
+class AmplifierRunner:
+    def __init__(self, opcodes):
+        self.opcodes = opcodes
+        self.phase_ouputs = []
+        self.amps = []
+    
+    @property
+    def output(self):
+        return self.phase_ouputs[-1]
+    
+    def run_sequence(self, sequence):
+        if len(sequence) == 0:
+            raise Exception("Bad Seq")
+        prev_output = 0
+        for index, phase in enumerate(sequence):
+            a = Amplifier(self.opcodes, phase, prev_output)
+            a.run()
+            if len(a.outputs) > 1:
+                raise Exception("longer outputs")
+            self.phase_ouputs.append(a.outputs[-1])
+            prev_output = a.outputs[-1]
+            self.amps.append(a)
+    
+    def run_feedback(self, sequence):
+        self.run_sequence(sequence)
+        self.continue_running()
+    
+    def continue_running(self):
+        prev_output = self.phase_ouputs[-1]
+        while True:
+            for amp in self.amps:
+                if amp.complete is True:
+                    return
+                amp.inputs.append(prev_output)
+                amp.run()
+                prev_output = amp.outputs[-1]
+                self.phase_ouputs.append(prev_output)
+
+
+class AmplifierNetwork:
+    # Amplifiers as coroutines wired together with asyncio queues. links maps
+    # an amplifier's index to the indexes its outputs are sent to.
+    def __init__(self, opcodes, phases, links):
+        # asyncio is imported where it is used, keeping it out of the
+        # package's import time for the days that never need it
+        import asyncio
+        self.amps = [Amplifier(opcodes, phase) for phase in phases]
+        self.queues = [asyncio.Queue() for _ in phases]
+        self.links = links
+        self.waiting = set()
+        # Every output in the order it was produced, as (index, value)
+        self.signals = []
+
+    @classmethod
+    def chain(cls, opcodes, phases, feedback=False):
+        links = {index: [index + 1] for index in range(len(phases) - 1)}
+        if feedback:
+            links[len(phases) - 1] = [0]
+        return cls(opcodes, phases, links)
+
+    @property
+    def output(self):
+        # Last signal out of the final amplifier
+        last = len(self.amps) - 1
+        return [value for index, value in self.signals if index == last][-1]
+
+    async def run(self, initial=None):
+        # initial maps amplifier indexes to their first signal
+        if initial is None:
+            initial = {0: 0}
+        for index, value in initial.items():
+            self.queues[index].put_nowait(value)
+        import asyncio
+        await asyncio.gather(*(self.run_amp(index) for index in range(len(self.amps))))
+
+    async def run_amp(self, index):
+        amp = self.amps[index]
+        while True:
+            amp.run()
+            values = list(amp.outputs)
+            amp.outputs.clear()
+            for value in values:
+                self.signals.append((index, value))
+                for target in self.links.get(index, ()):
+                    await self.queues[target].put(value)
+            if amp.complete:
+                self.check_deadlock()
+                return
+            self.waiting.add(index)
+            self.check_deadlock()
+            value = await self.queues[index].get()
+            self.waiting.discard(index)
+            amp.inputs.append(value)
+
+    def check_deadlock(self):
+        # Only one coroutine runs at a time, so if every unfinished amplifier
+        # is parked on an empty queue nothing can ever wake them
+        running = [index for index, amp in enumerate(self.amps) if not amp.complete]
+        if running and all(index in self.waiting and self.queues[index].empty() for index in running):
+            raise Exception("Amplifiers deadlocked")
+
+
+async def sweep_networks(opcodes, feedback=False, phases=None):
+    # Every permutation of phases as its own network, all interleaved on one
+    # event loop
+    if phases is None:
+        phases = [0,1,2,3,4] if feedback is False else [5,6,7,8,9]
+    import asyncio
+    networks = [AmplifierNetwork.chain(opcodes, combo, feedback) for combo in itertools.permutations(phases)]
+    await asyncio.gather(*(network.run() for network in networks))
+    best = max(networks, key=lambda network: network.output)
+    return best.output, tuple(amp.phase for amp in best.amps)
+
+def get_highest_signal(opcodes, feedback=False, phases=None):
+    items = phases
+    if items is None:
+        items = [0,1,2,3,4] if feedback is False else [5,6,7,8,9]
+    return highest_in(opcodes, itertools.permutations(items), feedback)
+
+def get_highest_signal_parallel(opcodes, feedback=False, phases=None, workers=None, chunk_size=120):
+    # Same answer as get_highest_signal, with the permutations split into
+    # chunks across a process pool and reduced in order
+    items = phases
+    if items is None:
+        items = [0,1,2,3,4] if feedback is False else [5,6,7,8,9]
+    permutations = itertools.permutations(items)
+    chunks = iter(lambda: list(itertools.islice(permutations, chunk_size)), [])
+    highest = 0
+    highest_combo = None
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(highest_in, itertools.repeat(opcodes), chunks, itertools.repeat(feedback))
+        for signal, combo in results:
+            if signal > highest:
+                highest_combo = combo
+                highest = signal
+    return highest, highest_combo
+
+class SeriesSweep:
+    # Series-mode sweep over the permutation trie. A fresh amplifier's output
+    # only depends on its phase and input signal, so every prefix shared by
+    # several permutations is only run once.
+    def __init__(self, opcodes):
+        self.opcodes = opcodes
+        # (phase, signal) -> output
+        self.outputs = {}
+        # phase prefix -> signal out of its last amplifier
+        self.prefixes = {(): 0}
+        self.runs = 0
+
+    def amplify(self, phase, signal):
+        key = (phase, signal)
+        if key not in self.outputs:
+            a = Amplifier(self.opcodes, phase, signal)
+            a.run()
+            if len(a.outputs) > 1:
+                raise Exception("longer outputs")
+            self.outputs[key] = a.outputs[-1]
+            self.runs += 1
+        return self.outputs[key]
+
+    def highest(self, phases=(0,1,2,3,4)):
+        highest = 0
+        highest_combo = None
+        # Depth first, children pushed in reverse so leaves come out in
+        # itertools.permutations order and ties resolve the same way
+        stack = [()]
+        while stack:
+            prefix = stack.pop()
+            if prefix not in self.prefixes:
+                self.prefixes[prefix] = self.amplify(prefix[-1], self.prefixes[prefix[:-1]])
+            if len(prefix) == len(phases):
+                if self.prefixes[prefix] > highest:
+                    highest_combo = prefix
+                    highest = self.prefixes[prefix]
+                continue
+            for phase in reversed(phases):
+                if phase not in prefix:
+                    stack.append(prefix + (phase,))
+        return highest, highest_combo
+
+def highest_in(opcodes, combos, feedback=False):
+    highest = 0
+    highest_combo = None
+    combo_map = {}
+    for i in combos:
+        
+        ar = AmplifierRunner(opcodes)
+        if feedback is False:
+            ar.run_sequence(i)
+        if feedback is True:
+            ar.run_feedback(i)
+        combo_map[ar.output] = i
+        if ar.output > highest:
+            highest_combo = i
+            highest = ar.output
+    # print(combo_map)
+    return highest, highest_combo
@@ -0,0 +1,400 @@
+import json
+
+from .compiled import CompiledProcessor
+from .loader import load_program
+
+
+class Instruction:
+    mnemonics = {
+        1: "add",
+        2: "mul",
+        3: "in",
+        4: "out",
+        5: "jnz",
+        6: "jz",
+        7: "lt",
+        8: "eq",
+        9: "arb",
+        99: "halt"
+    }
+    sizes = {
+        1: 4,
+        2: 4,
+        3: 2,
+        4: 2,
+        5: 3,
+        6: 3,
+        7: 4,
+        8: 4,
+        9: 2,
+        99: 1
+    }
+    # Index of the parameter each opcode writes to
+    write_params = {
+        1: 2,
+        2: 2,
+        3: 0,
+        7: 2,
+        8: 2
+    }
+    def __init__(self, address, opcode, modes, params):
+        self.address = address
+        self.opcode = opcode
+        self.modes = modes
+        self.params = params
+
+    @classmethod
+    def decode(cls, program, address):
+        # None where the word isn't a valid instruction or doesn't fit
+        code = program[address]
+        opcode = code % 100
+        if code < 0 or opcode not in cls.sizes:
+            return None
+        size = cls.sizes[opcode]
+        if address + size > len(program):
+            return None
+        modes = tuple(code // 10 ** (offset + 1) % 10 for offset in range(1, size))
+        if any(mode > 2 for mode in modes) or code >= 10 ** (size + 1):
+            return None
+        if opcode in cls.write_params and modes[cls.write_params[opcode]] == 1:
+            return None
+        return cls(address, opcode, modes, program[address + 1:address + size])
+
+    @property
+    def size(self):
+        return self.sizes[self.opcode]
+
+    @property
+    def end(self):
+        return self.address + self.size
+
+    @property
+    def write(self):
+        # (parameter index, mode) of the written operand, or None
+        if self.opcode not in self.write_params:
+            return None
+        index = self.write_params[self.opcode]
+        return index, self.modes[index]
+
+    def operand(self, index):
+        mode, value = self.modes[index], self.params[index]
+        if mode == 1:
+            return str(value)
+        if mode == 2:
+            return f"[rb{value:+d}]"
+        return f"[{value}]"
+
+    def text(self):
+        operands = ", ".join(self.operand(index) for index in range(len(self.params)))
+        return f"{self.mnemonics[self.opcode]:<5} {operands}".rstrip()
+
+
+class Analysis:
+    # What can be said about a program without running it. Code is found by
+    # following control flow from address 0. Jump targets given in immediate
+    # mode, or read from a cell no instruction writes, are resolved;
+    # anything through the relative base is dynamic, and then every constant
+    # an instruction stores that lands on an instruction is taken as a
+    # possible target (return addresses pushed by call sequences). With
+    # dynamic jumps left over, unreachable means not shown to be reachable.
+    def __init__(self, program):
+        self.program = list(program)
+        # address -> Instruction, for reachable code
+        self.instructions = {}
+        # jump address -> (target or None, "immediate"/"folded"/"dynamic")
+        self.jumps = {}
+        # instruction address -> addresses control can continue at
+        self.successors = {}
+        # Constants stored by instructions that look like code addresses
+        self.code_pointers = set()
+        # address -> why decoding stopped there
+        self.invalid = {}
+        # Program cells some instruction writes to at a known address
+        self.written = set()
+        # (writer, target) for writes through the relative base or through
+        # an address the program itself rewrites
+        self.unresolved_writes = []
+        # (writer, target, instruction) for writes landing inside code
+        self.self_modifying = []
+        while True:
+            self.explore()
+            written = self.written | self.static_writes()
+            if written == self.written:
+                break
+            self.written = written
+        self.find_self_modifying()
+        self.blocks = self.find_blocks()
+
+    def constant(self, instruction, index):
+        # Value of an operand when it can't change at run time
+        mode, value = instruction.modes[index], instruction.params[index]
+        if instruction.address + 1 + index in self.written:
+            return None
+        if mode == 1:
+            return value
+        if mode == 0 and 0 <= value < len(self.program) and value not in self.written:
+            return self.program[value]
+        return None
+
+    def explore(self):
+        self.instructions = {}
+        self.jumps = {}
+        self.successors = {}
+        self.invalid = {}
+        self.code_pointers = set()
+        roots = [0]
+        dynamic = False
+        while roots:
+            pending = [roots.pop()]
+            while pending:
+                address = pending.pop()
+                if address in self.instructions or address in self.invalid:
+                    continue
+                if not 0 <= address < len(self.program):
+                    self.invalid[address] = "outside the program"
+                    continue
+                instruction = Instruction.decode(self.program, address)
+                if instruction is None:
+                    if address in self.written:
+                        self.invalid[address] = "rewritten before it runs"
+                    else:
+                        self.invalid[address] = f"bad instruction {self.program[address]}"
+                    continue
+                self.instructions[address] = instruction
+                following = self.follow(instruction)
+                self.successors[address] = following
+                pending.extend(following)
+                if address in self.jumps and self.jumps[address][1] == "dynamic":
+                    dynamic = True
+                pointer = self.stored_constant(instruction)
+                if pointer is not None and 0 <= pointer < len(self.program):
+                    self.code_pointers.add(pointer)
+            if dynamic:
+                roots = [pointer for pointer in sorted(self.code_pointers, reverse=True)
+                         if pointer not in self.instructions and pointer not in self.invalid
+                         and Instruction.decode(self.program, pointer) is not None]
+
+    def follow(self, instruction):
+        opcode = instruction.opcode
+        if opcode == 99:
+            return []
+        if opcode != 5 and opcode != 6:
+            return [instruction.end]
+        condition = self.constant(instruction, 0) if instruction.modes[0] == 1 else None
+        target = self.constant(instruction, 1)
+        if target is None:
+            kind = "dynamic"
+        elif instruction.modes[1] == 1:
+            kind = "immediate"
+        else:
+            kind = "folded"
+        self.jumps[instruction.address] = (target, kind)
+        following = []
+        if condition is None or (condition == 0) == (opcode == 5):
+            following.append(instruction.end)
+        if target is not None and (condition is None or (condition != 0) == (opcode == 5)):
+            following.append(target)
+        return following
+
+    def stored_constant(self, instruction):
+        # Value an add or multiply of two constants writes
+        if instruction.opcode not in (1, 2) or instruction.modes[0] != 1 or instruction.modes[1] != 1:
+            return None
+        x, y = instruction.params[0], instruction.params[1]
+        return x + y if instruction.opcode == 1 else x * y
+
+    def write_target(self, instruction):
+        write = instruction.write
+        if write is None:
+            return None
+        index, mode = write
+        if mode == 2 or instruction.address + 1 + index in self.written:
+            return None
+        return instruction.params[index]
+
+    def static_writes(self):
+        return {self.write_target(instruction) for instruction in self.instructions.values()
+                if instruction.write is not None and self.write_target(instruction) is not None}
+
+    def find_self_modifying(self):
+        # Which instruction covers each word of code
+        owners = {}
+        for instruction in self.instructions.values():
+            for address in range(instruction.address, instruction.end):
+                owners[address] = instruction.address
+        for address, instruction in sorted(self.instructions.items()):
+            if instruction.write is None:
+                continue
+            target = self.write_target(instruction)
+            if target is None:
+                self.unresolved_writes.append((address, instruction.operand(instruction.write[0])))
+            elif target in owners:
+                self.self_modifying.append((address, target, owners[target]))
+            elif target in self.invalid:
+                # Code that only becomes valid once this write lands
+                self.self_modifying.append((address, target, target))
+
+    @property
+    def volatile(self):
+        # Code words the program is known to rewrite; a compiler must read
+        # these at run time instead of baking them in
+        return {target for _, target, _ in self.self_modifying}
+
+    def find_blocks(self):
+        # start -> (end, successors, dynamic). A block ends at a jump, a
+        # halt, or where another block is entered.
+        leaders = {0} | self.code_pointers
+        for address, following in self.successors.items():
+            if self.instructions[address].opcode in (5, 6, 99):
+                leaders.update(following)
+        blocks = {}
+        start = None
+        addresses = sorted(self.instructions)
+        for index, address in enumerate(addresses):
+            instruction = self.instructions[address]
+            if start is None:
+                start = address
+            following = self.successors[address]
+            contiguous = index + 1 < len(addresses) and addresses[index + 1] == instruction.end
+            if instruction.opcode in (5, 6, 99) or instruction.end in leaders or not contiguous:
+                dynamic = address in self.jumps and self.jumps[address][1] == "dynamic"
+                blocks[start] = (instruction.end, following, dynamic)
+                start = None
+        return blocks
+
+    @property
+    def unreachable(self):
+        # [start, end) ranges not covered by reachable code
+        covered = bytearray(len(self.program))
+        for instruction in self.instructions.values():
+            covered[instruction.address:instruction.end] = b"\x01" * instruction.size
+        ranges = []
+        start = None
+        for address, flag in enumerate(covered):
+            if not flag and start is None:
+                start = address
+            elif flag and start is not None:
+                ranges.append((start, address))
+                start = None
+        if start is not None:
+            ranges.append((start, len(self.program)))
+        return ranges
+
+    def to_dict(self):
+        return {
+            "size": len(self.program),
+            "instructions": [{
+                "address": address,
+                "opcode": instruction.opcode,
+                "modes": list(instruction.modes),
+                "params": list(instruction.params),
+                "text": instruction.text(),
+            } for address, instruction in sorted(self.instructions.items())],
+            "blocks": [{
+                "start": start,
+                "end": end,
+                "successors": following,
+                "dynamic": dynamic,
+            } for start, (end, following, dynamic) in sorted(self.blocks.items())],
+            "jumps": [{
+                "address": address,
+                "target": target,
+                "kind": kind,
+            } for address, (target, kind) in sorted(self.jumps.items())],
+            "code_pointers": sorted(self.code_pointers),
+            "self_modifying": [{
+                "writer": writer,
+                "target": target,
+                "instruction": owner,
+            } for writer, target, owner in self.self_modifying],
+            "unresolved_writes": [{"writer": writer, "target": target} for writer, target in self.unresolved_writes],
+            "unreachable": [list(span) for span in self.unreachable],
+            "invalid": {str(address): reason for address, reason in sorted(self.invalid.items())},
+        }
+
+    def to_json(self, indent=None):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def text(self):
+        kinds = [kind for _, kind in self.jumps.values()]
+        lines = [
+            f"{len(self.program)} words, {len(self.instructions)} instructions in {len(self.blocks)} blocks",
+            f"jumps: {kinds.count('immediate')} immediate, {kinds.count('folded')} folded, {kinds.count('dynamic')} dynamic",
+            f"self-modifying writes: {len(self.self_modifying)}, unresolved writes: {len(self.unresolved_writes)}",
+            f"unreachable: {sum(end - start for start, end in self.unreachable)} words in {len(self.unreachable)} ranges",
+        ]
+        rewrites = {}
+        for writer, target, owner in self.self_modifying:
+            rewrites.setdefault(writer, []).append(f"rewrites {target} in {owner}")
+        gaps = {start: end for start, end in self.unreachable}
+        for address in range(len(self.program)):
+            if address in gaps:
+                lines.append(f"{address:>7}  ... {gaps[address] - address} unreachable words")
+            if address in self.blocks:
+                end, following, dynamic = self.blocks[address]
+                targets = [str(target) for target in following] + (["?"] if dynamic else [])
+                lines.append("")
+                lines.append(f"block_{address}:  -> {', '.join(targets) or 'halt'}")
+            instruction = self.instructions.get(address)
+            if instruction is None:
+                continue
+            notes = list(rewrites.get(address, ()))
+            if address in self.jumps:
+                target, kind = self.jumps[address]
+                notes.append(f"{kind} target {'?' if target is None else target}")
+            comment = f"  ; {'; '.join(notes)}" if notes else ""
+            lines.append(f"{address:>7}  {instruction.text()}{comment}")
+        return "\n".join(lines)
+
+
+def analyze(program):
+    return Analysis(program)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m intcode", description="Disassemble an Intcode program and map out its control flow")
+    parser.add_argument("program", nargs="?", default="-", help="comma-separated program, - for stdin")
+    parser.add_argument("--json", action="store_true", help="print the analysis as JSON")
+    args = parser.parse_args(argv)
+    analysis = analyze(load_program(args.program))
+    print(analysis.to_json(indent=2) if args.json else analysis.text())
+    return 0
+
+
+def test_analyze():
+    # 1101 rewrites the output's parameter; the 1105 is never reached
+    analysis = analyze([1101,0,7,5,4,0,99,1105,1,0])
+    assert [address for address in analysis.instructions] == [0, 4, 6]
+    assert analysis.self_modifying == [(0, 5, 4)]
+    assert analysis.volatile == {5}
+    assert analysis.unreachable == [(7, 10)]
+    runner = CompiledProcessor([1101,0,7,5,4,0,99,42], analysis=analyze([1101,0,7,5,4,0,99,42]))
+    assert runner.volatile == {5}
+    runner.run()
+    assert runner.outputs == [42]
+    quine = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+    analysis = analyze(quine)
+    assert analysis.jumps[12] == (0, "immediate")
+    assert analysis.successors[12] == [15, 0]
+    assert analysis.unresolved_writes == [] and analysis.unreachable == []
+    assert sorted(analysis.blocks) == [0, 15]
+    assert json.loads(analysis.to_json())["blocks"][0] == {"start": 0, "end": 15, "successors": [15, 0], "dynamic": False}
+    assert "block_0:  -> 15, 0" in analysis.text()
+
+def test_analyze_calls():
+    # A call through the stack: push the return address, jump, return
+    # through the relative base
+    program = [109,20,21101,9,0,0,1105,1,12,99,0,0,104,7,2105,1,0]
+    analysis = analyze(program)
+    assert analysis.jumps[14] == (None, "dynamic")
+    assert 9 in analysis.code_pointers and 9 in analysis.instructions
+    assert analysis.unresolved_writes == [(2, "[rb+0]")]
+    # Folded: the target comes from a cell nothing writes
+    analysis = analyze([5,7,8,104,0,99,99,1,5])
+    assert analysis.jumps[0] == (5, "folded")
+    assert analysis.successors[0] == [3, 5]
+    # Day 5 builds its next instruction before running it
+    analysis = analyze([3,20,1,20,6,6,1100,1,238,20,99])
+    assert analysis.invalid == {6: "rewritten before it runs"}
+    assert analysis.self_modifying == [(2, 6, 6)]
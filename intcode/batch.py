@@ -0,0 +1,193 @@
+from .memory import PagedMemory
+from .processor import ImmediateProcessor, OpCodeProcessor
+
+# numpy takes longer to import than the rest of the package put together,
+# so it is only imported once a batch is actually built
+np = None
+
+def load_numpy():
+    # The numpy module, imported on first use, or None if it isn't installed
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+class BatchProcessor:
+    # N machines stepped in lockstep as the rows of one int64 array. Each
+    # step groups the running machines by opcode and runs every group with
+    # vectorised gathers and scatters; halted and waiting machines are
+    # masked out. Values are int64, so unlike OpCodeProcessor nothing grows
+    # past 64 bits.
+    def __init__(self, programs, inputs=None):
+        if load_numpy() is None:
+            raise Exception("BatchProcessor needs numpy")
+        count = len(programs)
+        if inputs is None:
+            inputs = [() for _ in programs]
+        if isinstance(programs, np.ndarray):
+            # Already one row per machine, e.g. np.tile of a single program
+            self.lengths = np.full(count, programs.shape[1], dtype=np.int64)
+            self.memory = np.pad(programs.astype(np.int64), ((0, 0), (0, 4)))
+        else:
+            self.lengths = np.array([len(program) for program in programs], dtype=np.int64)
+            width = int(self.lengths.max()) + 4
+            self.memory = np.array([list(program) + [0] * (width - len(program)) for program in programs], dtype=np.int64)
+        self.input_counts = np.array([len(values) for values in inputs], dtype=np.int64)
+        self.input_values = np.zeros((count, max(1, int(self.input_counts.max(initial=0)))), dtype=np.int64)
+        for row, values in enumerate(inputs):
+            self.input_values[row, :len(values)] = [int(value) for value in values]
+        self.input_positions = np.zeros(count, dtype=np.int64)
+        self.position = np.zeros(count, dtype=np.int64)
+        self.relative_base = np.zeros(count, dtype=np.int64)
+        self.complete = np.zeros(count, dtype=bool)
+        self.waiting = np.zeros(count, dtype=bool)
+        self.outputs = [[] for _ in programs]
+
+    def opcodes(self, row):
+        return self.memory[row, :self.lengths[row]].tolist()
+
+    def run(self):
+        while True:
+            running = ~(self.complete | self.waiting) & (self.position < self.lengths)
+            rows = np.nonzero(running)[0]
+            if rows.size == 0:
+                return
+            positions = self.position[rows]
+            self._ensure_width(int(positions.max()) + 4)
+            codes = self.memory[rows, positions]
+            opcodes = codes % 100
+            for opcode in np.unique(opcodes).tolist():
+                group = opcodes == opcode
+                self._execute(opcode, rows[group], positions[group], codes[group])
+
+    def _ensure_width(self, width):
+        if width > self.memory.shape[1]:
+            extra = max(width, 2 * self.memory.shape[1]) - self.memory.shape[1]
+            self.memory = np.pad(self.memory, ((0, 0), (0, extra)))
+
+    def _address(self, rows, positions, codes, offset):
+        mode = codes // 10 ** (offset + 1) % 10
+        if (mode > 2).any():
+            raise Exception(f'Mode {int(mode.max())} not known')
+        raw = self.memory[rows, positions + offset]
+        address = np.where(mode == 1, positions + offset, raw)
+        address = np.where(mode == 2, raw + self.relative_base[rows], address)
+        if (address < 0).any():
+            raise Exception("Negative address")
+        return address, mode
+
+    def _read(self, rows, positions, codes, offset):
+        address, mode = self._address(rows, positions, codes, offset)
+        self._ensure_width(int(address.max()) + 1)
+        return self.memory[rows, address]
+
+    def _write(self, rows, positions, codes, offset, values):
+        address, mode = self._address(rows, positions, codes, offset)
+        if (mode == 1).any():
+            raise Exception("Cannot write in Immediate mode.")
+        self._ensure_width(int(address.max()) + 1)
+        self.memory[rows, address] = values
+        self.lengths[rows] = np.maximum(self.lengths[rows], address + 1)
+
+    def _execute(self, opcode, rows, positions, codes):
+        if opcode == 99:
+            self.complete[rows] = True
+        elif opcode in (1, 2, 7, 8):
+            x = self._read(rows, positions, codes, 1)
+            y = self._read(rows, positions, codes, 2)
+            if opcode == 1:
+                values = x + y
+            elif opcode == 2:
+                values = x * y
+            elif opcode == 7:
+                values = (x < y).astype(np.int64)
+            else:
+                values = (x == y).astype(np.int64)
+            self._write(rows, positions, codes, 3, values)
+            self.position[rows] = positions + 4
+        elif opcode in (5, 6):
+            x = self._read(rows, positions, codes, 1)
+            y = self._read(rows, positions, codes, 2)
+            jump = x != 0 if opcode == 5 else x == 0
+            self.position[rows] = np.where(jump, y, positions + 3)
+        elif opcode == 3:
+            ready = self.input_positions[rows] < self.input_counts[rows]
+            # Pause until re-activated
+            self.waiting[rows[~ready]] = True
+            rows, positions, codes = rows[ready], positions[ready], codes[ready]
+            if rows.size:
+                values = self.input_values[rows, self.input_positions[rows]]
+                self._write(rows, positions, codes, 1, values)
+                self.input_positions[rows] += 1
+                self.position[rows] = positions + 2
+        elif opcode == 4:
+            values = self._read(rows, positions, codes, 1)
+            for row, value in zip(rows.tolist(), values.tolist()):
+                self.outputs[row].append(value)
+            self.position[rows] = positions + 2
+        elif opcode == 9:
+            self.relative_base[rows] += self._read(rows, positions, codes, 1)
+            self.position[rows] = positions + 2
+        else:
+            raise Exception("Failed to run!")
+
+def run_batch(programs, inputs=None):
+    batch = BatchProcessor(programs, inputs)
+    batch.run()
+    return batch
+
+class BatchEngine(OpCodeProcessor):
+    # One machine on the batch engine, behind the OpCodeProcessor interface
+    # so it can stand in for the other engines. Each run() loads the machine
+    # into a one-row batch and copies it back once the batch stops; it runs
+    # until a halt or a missing input, whatever until_outputs asks for.
+    def run(self, until_outputs=None):
+        if self.profile is not None or self.recording is not None:
+            return self.run_stepped(until_outputs)
+        if self.memory.pages or self.memory.big:
+            raise Exception("BatchEngine only handles the dense region")
+        batch = BatchProcessor([self.opcodes], [list(self.inputs)])
+        batch.position[0] = self.position
+        batch.relative_base[0] = self.relative_base
+        batch.run()
+        for _ in range(int(batch.input_positions[0])):
+            self.inputs.popleft()
+        self.outputs.extend(batch.outputs[0])
+        self.memory = PagedMemory(batch.opcodes(0))
+        self.decoded = {}
+        self.position = int(batch.position[0])
+        self.relative_base = int(batch.relative_base[0])
+        self.complete = bool(batch.complete[0])
+        self.waiting = bool(batch.waiting[0])
+
+
+def test_run_batch():
+    if load_numpy() is None:
+        return
+    programs = [[1,0,0,0,99], [2,3,0,3,99], [2,4,4,5,99,0], [1,1,1,4,99,5,6,0,99]]
+    batch = run_batch(programs)
+    assert [batch.opcodes(row) for row in range(4)] == [ImmediateProcessor(p).opcodes for p in programs]
+    assert batch.complete.all()
+    input_1 = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+    input_2 = [3,9,8,9,10,9,4,9,99,-1,8]
+    batch = run_batch([input_1, input_2, input_2, input_2], [[], [8], [7], []])
+    assert batch.outputs == [input_1, [1], [0], []]
+    assert batch.waiting.tolist() == [False, False, False, True]
+    variants = np.tile(np.array([1,0,0,0,99,7,8]), (3, 1))
+    variants[:, 1] = [5, 5, 6]
+    variants[:, 2] = [5, 6, 6]
+    assert run_batch(variants).memory[:, 0].tolist() == [14, 15, 16]
+
+def test_batch_engine():
+    if load_numpy() is None:
+        return
+    runner = BatchEngine([3,0,4,0,3,0,4,0,99])
+    runner.run()
+    assert runner.waiting and runner.position == 0
+    runner.inputs.extend([5, 6])
+    runner.run()
+    assert runner.outputs == [5, 6] and runner.complete and runner.opcodes[0] == 6
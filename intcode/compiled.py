@@ -0,0 +1,233 @@
+from .memory import PagedMemory
+from .processor import OpCodeProcessor
+
+class CompiledProcessor(OpCodeProcessor):
+    # Tier-2 engine: straight-line runs of instructions are compiled into
+    # Python functions with their modes and constant operands baked in.
+    param_counts = {
+        1: 3,
+        2: 3,
+        4: 1,
+        5: 2,
+        6: 2,
+        7: 3,
+        8: 3,
+        9: 1
+    }
+    def __init__(self, opcodes, analysis=None, **kwargs):
+        super().__init__(opcodes, **kwargs)
+        # start -> compiled function, start -> end (exclusive)
+        self.blocks = {}
+        self.block_spans = {}
+        # address -> starts of the blocks that baked in its value
+        self.covered = {}
+        # addresses the program has written to after they were compiled,
+        # starting from the code words an Analysis found being rewritten
+        self.volatile = set(analysis.volatile) if analysis is not None else set()
+
+    def set_value(self, position, data):
+        super().set_value(position, data)
+        if position in self.covered:
+            self.invalidate(position)
+
+    def invalidate(self, address):
+        self.volatile.add(address)
+        for start in self.covered.pop(address, ()):
+            if start not in self.blocks:
+                continue
+            del self.blocks[start]
+            for other in range(start, self.block_spans.pop(start)):
+                if other in self.covered:
+                    starts = tuple(block for block in self.covered[other] if block != start)
+                    if starts:
+                        self.covered[other] = starts
+                    else:
+                        del self.covered[other]
+
+    def compile_block(self, start):
+        memory = self.opcodes
+        size = len(memory)
+        lines = []
+        baked = []
+        position = start
+        while position < size:
+            opcode = memory[position] % 100
+            if opcode not in self.param_counts:
+                break
+            opcode, mode_1, mode_2, mode_3 = self.decode_word(memory[position], position)
+            count = self.param_counts[opcode]
+            if position + count >= size:
+                break
+            baked.append(position)
+            params = []
+            for address in range(position + 1, position + 1 + count):
+                # Parameters the program rewrites are read at run time so
+                # the block survives the write.
+                if address in self.volatile:
+                    params.append(f"memory[{address}]")
+                else:
+                    params.append(str(memory[address]))
+                    baked.append(address)
+            modes = (mode_1, mode_2, mode_3)
+            operands = [self._operand(params[i], modes[i], size) for i in range(count)]
+            position += count + 1
+            if opcode == 4:
+                lines.append(f"outputs.append({operands[0]})")
+                break
+            if opcode == 9:
+                lines.append(f"rb += {operands[0]}")
+                continue
+            if opcode == 5 or opcode == 6:
+                test = "!=" if opcode == 5 else "=="
+                lines.append(f"if {operands[0]} {test} 0:")
+                lines.append(f"    return {operands[1]}, rb")
+                break
+            if opcode == 1:
+                value = f"{operands[0]} + {operands[1]}"
+            elif opcode == 2:
+                value = f"{operands[0]} * {operands[1]}"
+            elif opcode == 7:
+                value = f"1 if {operands[0]} < {operands[1]} else 0"
+            else:
+                value = f"1 if {operands[0]} == {operands[1]} else 0"
+            target = params[2] if mode_3 == 0 else f"rb + {params[2]}"
+            if target.isdigit() and int(target) < size:
+                lines.append(f"memory[{target}] = {value}")
+            else:
+                lines.append(f"t = {target}")
+                lines.append("if t < len(memory):")
+                lines.append(f"    memory[t] = {value}")
+                lines.append("else:")
+                lines.append(f"    vm.memory.write(t, {value})")
+                target = "t"
+            lines.append(f"if {target} in covered:")
+            lines.append(f"    vm.invalidate({target})")
+            lines.append(f"    return {position}, rb")
+        if position == start:
+            return None
+        lines.append(f"return {position}, rb")
+        # Blocks only see the machine through their arguments, so forks can
+        # share them.
+        source = "def block(memory, rb, outputs, covered, vm):\n" + "".join(f"    {line}\n" for line in lines)
+        namespace = {}
+        exec(compile(source, f"<intcode block {start}>", "exec"), namespace)
+        block = namespace["block"]
+        self.blocks[start] = block
+        self.block_spans[start] = position
+        covered = self.covered
+        for address in baked:
+            starts = covered.get(address, ())
+            if start not in starts:
+                covered[address] = starts + (start,)
+        return block
+
+    def _operand(self, param, mode, size):
+        if mode == 1:
+            return f"({param})"
+        if mode == 0 and param.isdigit() and int(param) < size:
+            return f"memory[{param}]"
+        address = param if mode == 0 else f"rb + {param}"
+        return f"(memory[{address}] if {address} < len(memory) else vm.memory.read({address}))"
+
+    def fork(self):
+        clone = super().fork()
+        clone.copy_blocks(self)
+        return clone
+
+    def restore(self, snapshot):
+        super().restore(snapshot)
+        self.copy_blocks(snapshot)
+
+    def copy_blocks(self, other):
+        self.blocks = dict(other.blocks)
+        self.block_spans = dict(other.block_spans)
+        self.covered = dict(other.covered)
+        self.volatile = set(other.volatile)
+
+    def run(self, until_outputs=None):
+        if self.profile is not None or self.recording is not None:
+            return self.run_stepped(until_outputs)
+        self.waiting = False
+        memory = self.memory.writable()
+        covered = self.covered
+        blocks = self.blocks
+        position = self.position
+        relative_base = self.relative_base
+        outputs = self.outputs
+        try:
+            while position < len(memory):
+                block = blocks.get(position)
+                if block is None:
+                    block = self.compile_block(position)
+                if block is not None:
+                    position, relative_base = block(memory, relative_base, outputs, covered, self)
+                    if until_outputs and len(outputs) >= until_outputs:
+                        return
+                    continue
+                # Inputs, halts and anything the compiler stopped on are
+                # stepped by the interpreter.
+                opcode, mode_1, mode_2, mode_3 = self.decode_word(memory[position], position)
+                if opcode == 99:
+                    self.complete = True
+                    return
+                if opcode != 3:
+                    raise Exception("Failed to run!")
+                if self.inputs:
+                    this_input = int(self.inputs.popleft())
+                elif self.interactive is False:
+                    # Pause until re-activated
+                    self.waiting = True
+                    return
+                else:
+                    this_input = int(input("Program input: "))
+                target = memory[position + 1]
+                if mode_1 == 2:
+                    target += relative_base
+                self.set_value(target, this_input)
+                position += 2
+        finally:
+            self.position = position
+            self.relative_base = relative_base
+
+
+def test_compiled_engine():
+    input_1 = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+    runner = CompiledProcessor(input_1)
+    runner.run()
+    assert runner.outputs == input_1
+    # 1101 rewrites the parameter of the output that follows it
+    runner = CompiledProcessor([1101,0,7,5,4,0,99,42])
+    runner.run()
+    assert runner.outputs == [42]
+    assert 5 in runner.volatile
+
+def test_paged_engines():
+    far = 10 ** 9
+    for engine in (OpCodeProcessor, CompiledProcessor):
+        runner = engine([1101,5,6,far,4,far,109,far,22201,0,0,0,204,0,99])
+        runner.run()
+        assert runner.outputs == [11, 22]
+        assert len(runner.opcodes) == 15
+        assert list(runner.memory.pages) == [far // PagedMemory.page_size]
+
+def test_fork_and_restore():
+    far = 10 ** 9
+    page = far // PagedMemory.page_size
+    program = [3,far,1001,far,1,far,4,far,3,far,4,far,99]
+    for engine in (OpCodeProcessor, CompiledProcessor):
+        runner = engine(program, inputs=[5])
+        runner.run()
+        snapshot = runner.snapshot()
+        child = runner.fork()
+        assert child.memory.pages[page] is runner.memory.pages[page]
+        child.inputs.append(7)
+        child.run()
+        assert child.outputs == [6, 7]
+        assert runner.memory.read(far) == 6
+        for value in (8, 9):
+            runner.restore(snapshot)
+            runner.inputs.append(value)
+            runner.run()
+            assert runner.outputs == [6, value]
+            assert runner.complete
+        assert snapshot.memory.read(far) == 6
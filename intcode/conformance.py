@@ -0,0 +1,88 @@
+import os
+
+from .batch import BatchEngine, load_numpy
+from .engines import engines
+from .loader import load_program
+from .processor import ReferenceProcessor
+
+# Cases from the day 2, 5, 7 and 9 puzzle tests that every registered engine
+# has to pass.
+
+# Puzzle programs are named by their day and read from its directory when
+# a test runs, rather than pasted here or loaded on import
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def puzzle_program(day):
+    # Parsed without the program cache, so tests never write to it
+    return load_program(os.path.join(repo_root, day, f"{day}_input.txt"), cache_dir=False)
+
+quine = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+
+# (program or day name, inputs, outputs, final memory), None where a case
+# doesn't check it
+machine_cases = [
+    ([1,0,0,0,99], [], [], [2,0,0,0,99]),
+    ([2,3,0,3,99], [], [], [2,3,0,6,99]),
+    ([2,4,4,5,99,0], [], [], [2,4,4,5,99,9801]),
+    ([1,1,1,4,99,5,6,0,99], [], [], [30,1,1,4,2,5,6,0,99]),
+    ("day_5", ["1"], [0,0,0,0,0,0,0,0,0,13547311], None),
+    ("day_5", ["5"], [236453], None),
+    (quine, [], quine, None),
+    ([1102,34915192,34915192,7,4,7,99], [], [1219070632396864], None),
+    ([104,1125899906842624,99], [], [1125899906842624], None),
+]
+
+# (program, phases, feedback, final signal)
+amplifier_cases = [
+    ([3,15,3,16,1002,16,10,16,1,16,15,15,4,15,99,0,0], [4,3,2,1,0], False, 43210),
+    ([3,23,3,24,1002,24,10,24,1002,23,-1,23,101,5,23,23,1,24,23,23,4,23,99,0,0], [0,1,2,3,4], False, 54321),
+    ([3,31,3,32,1002,32,10,32,1001,31,-2,31,1007,31,0,33,1002,33,7,33,1,33,31,31,1,32,31,31,4,31,99,0,0,0], [1,0,4,3,2], False, 65210),
+    ([3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5], [9,8,7,6,5], True, 139629729),
+    ([3,52,1001,52,-5,52,3,53,1,52,56,54,1007,54,5,55,1005,55,26,1001,54,-5,54,1105,1,12,1,53,54,53,1008,54,0,55,1001,55,1,55,2,53,55,53,4,53,1001,56,-1,56,1005,56,6,99,0,0,0,0,10], [9,7,8,5,6], True, 18216),
+]
+
+
+def run_amplifiers(engine, program, phases, feedback=False):
+    # Chains one machine per phase, looping the last output back to the
+    # first machine until the last one halts when feedback is set
+    amps = [engine(program, inputs=[phase]) for phase in phases]
+    signal = 0
+    while True:
+        for amp in amps:
+            amp.inputs.append(signal)
+            amp.run()
+            signal = amp.outputs[-1]
+        if not feedback or amps[-1].complete:
+            return signal
+
+
+def test_conformance():
+    for name, engine in engines.items():
+        if engine is BatchEngine and load_numpy() is None:
+            continue
+        for program, inputs, outputs, memory in machine_cases:
+            if isinstance(program, str):
+                program = puzzle_program(program)
+            runner = engine(program, inputs=inputs)
+            runner.run()
+            assert runner.complete, name
+            if outputs is not None:
+                assert runner.outputs == outputs, name
+            if memory is not None:
+                assert runner.opcodes == memory, name
+        for program, phases, feedback, signal in amplifier_cases:
+            assert run_amplifiers(engine, program, phases, feedback) == signal, name
+
+def test_day_13_game():
+    # The whole day 13 screen, every engine against the reference one
+    program = puzzle_program("day_13")
+    reference = ReferenceProcessor(program)
+    reference.run()
+    assert reference.complete
+    for name, engine in engines.items():
+        if engine is BatchEngine and load_numpy() is None:
+            continue
+        runner = engine(program)
+        runner.run()
+        assert runner.complete, name
+        assert runner.outputs == reference.outputs, name
@@ -0,0 +1,26 @@
+import os
+
+from .batch import BatchEngine
+from .compiled import CompiledProcessor
+from .processor import OpCodeProcessor, ReferenceProcessor
+
+# Name -> processor class. Every engine takes the OpCodeProcessor arguments
+# and has to give the same answers; conformance.py checks them all.
+engines = {}
+
+def register_engine(name, engine):
+    engines[name] = engine
+    return engine
+
+def get_engine(name=None):
+    # With no name, INTCODE_ENGINE picks one, falling back to "fast"
+    if name is None:
+        name = os.environ.get("INTCODE_ENGINE", "fast")
+    if name not in engines:
+        raise Exception(f"Unknown engine {name}, expected one of {', '.join(engines)}")
+    return engines[name]
+
+register_engine("reference", ReferenceProcessor)
+register_engine("fast", OpCodeProcessor)
+register_engine("compiled", CompiledProcessor)
+register_engine("batch", BatchEngine)
@@ -0,0 +1,147 @@
+from array import array
+import hashlib
+import io
+import json
+import mmap
+import os
+import sys
+
+def load_program(source="-", cache_dir=None):
+    # Comma-separated Intcode from a path, or stdin for "-". With cache_dir
+    # (or INTCODE_CACHE) set, parsed programs are cached there under the
+    # hash of their text as raw int64 words, with a JSON side table for
+    # values that don't fit; later loads of the same text map that file
+    # instead of parsing it again. cache_dir=False turns the cache off even
+    # when INTCODE_CACHE is set.
+    if source == "-":
+        text = sys.stdin.buffer.read()
+    else:
+        with open(source, "rb") as f:
+            text = f.read()
+    text = text.strip()
+    if cache_dir is None:
+        cache_dir = os.environ.get("INTCODE_CACHE")
+    if not cache_dir:
+        return list(map(int, text.split(b",")))
+    base = os.path.join(cache_dir, hashlib.sha256(text).hexdigest())
+    try:
+        return read_cached_program(base)
+    except (OSError, ValueError):
+        # Missing or damaged entry: parse again and overwrite it
+        pass
+    program = list(map(int, text.split(b",")))
+    try:
+        write_cached_program(base, program)
+    except OSError:
+        # The cache is only an optimisation
+        pass
+    return program
+
+def read_cached_program(base):
+    # The words file starts with two int64 header words, the word count and
+    # the number of entries in the side table, so a truncated or mismatched
+    # entry raises ValueError instead of loading silently.
+    with open(base + ".q", "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < 16 or size % 8:
+            raise ValueError(f"{base}.q: bad size {size}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                words = view.cast("q")
+                try:
+                    count, big_count = words[0], words[1]
+                    if size != 16 + 8 * count:
+                        raise ValueError(f"{base}.q: expected {count} words, found {size // 8 - 2}")
+                    program = words[2:].tolist()
+                finally:
+                    words.release()
+            finally:
+                view.release()
+    if big_count:
+        with open(base + ".big.json") as f:
+            big = json.load(f)
+        if len(big) != big_count:
+            raise ValueError(f"{base}.big.json: expected {big_count} entries, found {len(big)}")
+        for index, value in big.items():
+            program[int(index)] = value
+    return program
+
+def write_cached_program(base, program):
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    low, high = -2**63, 2**63 - 1
+    big = {index: value for index, value in enumerate(program) if not low <= value <= high}
+    words = array("q", [len(program), len(big)])
+    words.extend([0 if index in big else value for index, value in enumerate(program)] if big else program)
+    if big:
+        write_replacing(base + ".big.json", "w", lambda f: json.dump(big, f))
+    # The words file goes last: its presence marks a complete entry
+    write_replacing(base + ".q", "wb", words.tofile)
+
+def write_replacing(path, mode, write):
+    # Writes through a uniquely named temporary file that then atomically
+    # replaces path, so concurrent writers never see each other's halves.
+    # tempfile is only needed on a cache miss.
+    import tempfile
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with open(fd, mode) as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def test_damaged_cache(tmp_path):
+    source = tmp_path / "program.txt"
+    source.write_text("1,0,0,0,99," + str(2**70) + "\n")
+    program = [1, 0, 0, 0, 99, 2**70]
+    cache_dir = str(tmp_path / "cache")
+    assert load_program(str(source), cache_dir=cache_dir) == program
+    [cached] = [name for name in os.listdir(cache_dir) if name.endswith(".q")]
+    cached = os.path.join(cache_dir, cached)
+    base = cached[:-2]
+    assert read_cached_program(base) == program
+    with open(cached, "rb") as f:
+        data = f.read()
+    for damaged in (data[:-8], data[:-3], data[:5], b""):
+        with open(cached, "wb") as f:
+            f.write(damaged)
+        try:
+            read_cached_program(base)
+            assert False, "damaged cache entry loaded"
+        except ValueError:
+            pass
+        assert load_program(str(source), cache_dir=cache_dir) == program
+        assert read_cached_program(base) == program
+    os.remove(base + ".big.json")
+    assert load_program(str(source), cache_dir=cache_dir) == program
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".tmp")]
+
+def test_load_program(tmp_path, monkeypatch):
+    source = tmp_path / "program.txt"
+    source.write_text("109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99,1125899906842624000000\n")
+    cache = tmp_path / "cache"
+    program = load_program(str(source), cache_dir=str(cache))
+    assert program[:3] == [109, 1, 204] and program[-1] == 1125899906842624000000
+    assert len(list(cache.glob("*.q"))) == 1 and len(list(cache.glob("*.big.json"))) == 1
+    # Surrounding whitespace doesn't change the key; this comes from the cache
+    source.write_text("109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99,1125899906842624000000")
+    assert load_program(str(source), cache_dir=str(cache)) == program
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(b"104,7,99")))
+    assert load_program(cache_dir=str(cache)) == [104, 7, 99]
+
+def test_cache_opt_in(tmp_path, monkeypatch):
+    source = tmp_path / "program.txt"
+    source.write_text("104,7,99\n")
+    cache = tmp_path / "cache"
+    monkeypatch.delenv("INTCODE_CACHE", raising=False)
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    assert load_program(str(source)) == [104, 7, 99]
+    assert not (tmp_path / "home").exists()
+    monkeypatch.setenv("INTCODE_CACHE", str(cache))
+    assert load_program(str(source), cache_dir=False) == [104, 7, 99]
+    assert not cache.exists()
+    assert load_program(str(source)) == [104, 7, 99]
+    assert len(list(cache.glob("*.q"))) == 1
@@ -0,0 +1,140 @@
+from array import array
+from collections import deque
+
+class Channel(deque):
+    # FIFO for machine inputs and outputs. Compares equal to a list holding
+    # the same items so existing callers can keep checking against lists.
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, deque)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def drain(self):
+        items = list(self)
+        self.clear()
+        return items
+
+    def read_chunks(self, size):
+        # Complete size-tuples in order; a partial chunk stays queued
+        popleft = self.popleft
+        while len(self) >= size:
+            yield tuple([popleft() for _ in range(size)])
+
+class PagedMemory:
+    # The program region stays a plain list. Writes just past its end grow
+    # it, anything further out lands in int64 pages allocated on first touch.
+    page_size = 1024
+    def __init__(self, dense):
+        self.dense = dense
+        self.pages = {}
+        # Values too large for a page slot
+        self.big = {}
+        # Pages this copy may write in place; the rest are shared with forks
+        self.owned = set()
+        # While the dense list is shared with forks, a one-item list holding
+        # how many memories still use it. The last one left writes in place.
+        self.sharers = None
+
+    def fork(self):
+        # Nothing is copied here. The dense list is copied by the first
+        # sharer to write, and only while another one still holds it.
+        clone = type(self)(self.dense)
+        clone.pages = dict(self.pages)
+        clone.big = dict(self.big)
+        if self.sharers is None:
+            self.sharers = [1]
+        self.sharers[0] += 1
+        clone.sharers = self.sharers
+        self.owned = set()
+        return clone
+
+    def writable(self):
+        # Dense list safe to write through directly
+        if self.sharers is not None:
+            if self.sharers[0] > 1:
+                self.sharers[0] -= 1
+                self.dense = self.dense.copy()
+            self.sharers = None
+        return self.dense
+
+    def release(self):
+        # Drops this memory's hold on a shared dense list; it must not be
+        # used afterwards
+        if self.sharers is not None:
+            self.sharers[0] -= 1
+            self.sharers = None
+
+    def read(self, address):
+        if address < len(self.dense):
+            return self.dense[address]
+        if address in self.big:
+            return self.big[address]
+        page = self.pages.get(address // self.page_size)
+        if page is None:
+            return 0
+        return page[address % self.page_size]
+
+    def write(self, address, data):
+        dense = self.writable()
+        if address < len(dense):
+            dense[address] = data
+            return
+        if address < len(dense) + self.page_size:
+            for other in range(len(dense), address):
+                dense.append(self.read(other))
+            dense.append(data)
+            self._drop_below(len(dense))
+            return
+        page_number, offset = divmod(address, self.page_size)
+        if page_number not in self.owned:
+            if page_number in self.pages:
+                self.pages[page_number] = array('q', self.pages[page_number])
+            else:
+                self.pages[page_number] = array('q', bytes(8 * self.page_size))
+            self.owned.add(page_number)
+        page = self.pages[page_number]
+        try:
+            page[offset] = data
+        except OverflowError:
+            page[offset] = 0
+            self.big[address] = data
+            return
+        if address in self.big:
+            del self.big[address]
+
+    def _drop_below(self, limit):
+        # Pages and big values now shadowed by the dense region
+        for page_number in [p for p in self.pages if (p + 1) * self.page_size <= limit]:
+            del self.pages[page_number]
+            self.owned.discard(page_number)
+        for address in [a for a in self.big if a < limit]:
+            del self.big[address]
+
+
+def test_paged_memory():
+    far = 10 ** 9
+    memory = PagedMemory([1,2,3])
+    memory.write(far, 2 ** 70)
+    memory.write(5, 9)
+    assert memory.read(far) == 2 ** 70
+    assert memory.dense == [1,2,3,0,0,9]
+
+def test_shared_dense():
+    memory = PagedMemory([1,2,3])
+    child = memory.fork()
+    assert child.dense is memory.dense
+    child.write(0, 7)
+    assert memory.dense == [1,2,3] and child.dense == [7,2,3]
+    # The parent is the last holder of the original list now
+    original = memory.dense
+    memory.write(1, 8)
+    assert memory.dense is original and memory.dense == [1,8,3]
+    snapshot = memory.fork()
+    memory.write(2, 9)
+    assert snapshot.dense == [1,8,3] and memory.dense == [1,8,9]
@@ -0,0 +1,240 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+class OpCode(ABC):
+    takes_input = False
+    
+    def __init__(self, opcodes, current_position, **kwargs):
+        current_code = opcodes[current_position]
+        if opcodes[current_position] % 100 != self.my_opcode:
+            raise Exception("Bad Opcode")
+        self.modes = False
+        self.parse_modes(current_code)
+        self._opcodes = opcodes
+        self.should_continue = True
+        self.position = current_position
+        self.base_position = current_position
+        self.kwargs = kwargs
+        self.output = None
+        self.ran = False
+        self.relative_base = 0 
+        if 'relative_base' in kwargs:
+            self.relative_base = kwargs['relative_base']
+    
+    @property
+    @lru_cache()
+    def opcodes(self):
+        if self.ran:
+            return self._opcodes
+        self.operation()
+        self.ran = True
+        return self._opcodes
+    
+    def run(self):
+        if self.ran:
+            return
+        self.operation()
+        self.ran = True
+    
+    def parse_modes(self, opcode):
+        if opcode < 100:
+            return
+        opstring = str(opcode).zfill(5)
+        self.modes = opstring[-3::-1]
+        # print(f"Modes: {self.modes}")
+
+    def fetch_value(self, position, write=False, mode="0"):
+        # Modes are 0 - position 1 - immediate
+        # Now 2 - Relative
+        # print(f"Fetching {position} - {self._opcodes[position]}")
+        data_at_loc = self._opcodes[position]
+        if self.modes:
+            mode = self.modes[position - self.base_position - 1]
+        if mode == "1" and write:
+            raise Exception("Cannot write in Immediate mode.")
+        if mode == "0":
+            position = data_at_loc
+        elif mode == "1":
+            position = position
+        elif mode == "2":
+            position = self.relative_base + data_at_loc
+        else:
+            raise Exception(f'Mode {mode} not known')
+        if position >= len(self._opcodes):
+            self._resize_to(position)
+        if write:
+            return position
+        return self._opcodes[position]
+    
+    def set_value(self, position, data):
+        if position >= len(self._opcodes):
+            self._resize_to(position)
+        self._opcodes[position] = data
+        
+    def _resize_to(self, size):
+        extra_data = size - len(self._opcodes) + 1
+        self._opcodes.extend([0 for i in range(extra_data)])
+    
+    @property
+    def param_1(self):
+        position = self.base_position + 1
+        return self.fetch_value(position)
+    
+    @property
+    def param_2(self):
+        position = self.base_position + 2
+        return self.fetch_value(position)
+
+    @property
+    def param_3(self):
+        position = self.base_position + 3
+        return self.fetch_value(position)
+
+    @property
+    def write_param_1(self):
+        position = self.base_position + 1
+        return self.fetch_value(position, write=True)
+    
+    @property
+    def write_param_2(self):
+        position = self.base_position + 2
+        return self.fetch_value(position, write=True)
+
+    @property
+    def write_param_3(self):
+        position = self.base_position + 3
+        return self.fetch_value(position, write=True)
+    
+    @property
+    @abstractmethod
+    def my_opcode(self):
+        pass
+
+    
+    @abstractmethod
+    def operation(self):
+        pass
+    
+class OpCode99(OpCode):
+    # Halt
+    @property
+    def my_opcode(self):
+        return 99
+
+    def operation(self):
+        self.should_continue = False
+
+
+class OpCode1(OpCode):
+    # Add Params
+    @property
+    def my_opcode(self):
+        return 1
+
+    def operation(self):
+        # print(f"Param1 {self.param_1}, Param2 {self.param_2}, param3 {self.param_3} ")
+        self.set_value(self.write_param_3, self.param_1 + self.param_2)
+        self.position += 4
+
+class OpCode2(OpCode):
+    # Multiply Params
+    @property
+    def my_opcode(self):
+        return 2
+            
+    def operation(self):
+        # print(f"Param1 {self.param_1}, Param2 {self.param_2}, param3 {self.param_3} ")
+        self.set_value(self.write_param_3, self.param_1 * self.param_2)
+        self.position += 4
+
+class OpCode3(OpCode):
+    takes_input = True
+    # Input
+    @property
+    def my_opcode(self):
+        return 3
+
+    def operation(self):
+        # Store a value provided to position
+        this_input = int(self.kwargs["input"]) if "input" in self.kwargs else int(input("Program input: "))
+        # print(f"Modes: {self.modes}")
+        # print(f"putting {this_input} in position {self.write_param_1}")
+        # print(f"Relative Base: {self.relative_base}")
+        # print(f"{self._opcodes[self.position:self.position+2]}")
+        self.set_value(self.write_param_1, this_input)
+        # print(f"POsition {self.write_param_1}: {self._opcodes[self.write_param_1]}")
+        self.position += 2
+
+class OpCode4(OpCode):
+    # Output (Print)
+    @property
+    def my_opcode(self):
+        return 4
+    
+    def operation(self):
+        digit = self.param_1
+        #print(f"Output: {digit}")
+        self.output = digit
+        self.position += 2
+
+class OpCode5(OpCode):
+    # Jump if true
+    @property
+    def my_opcode(self):
+        return 5
+    
+    def operation(self):
+        if self.param_1 != 0:
+            self.position = self.param_2
+        else:
+            self.position += 3
+
+class OpCode6(OpCode):
+    # Jump if false
+    @property
+    def my_opcode(self):
+        return 6
+    
+    def operation(self):
+        if self.param_1 == 0:
+            self.position = self.param_2
+        else:
+            self.position += 3
+
+class OpCode7(OpCode):
+    # Less Than
+    @property
+    def my_opcode(self):
+        return 7
+    
+    def operation(self):
+        if self.param_1 < self.param_2:
+            output = 1
+        else:
+            output = 0
+        self.set_value(self.write_param_3, output)
+        self.position += 4
+
+class OpCode8(OpCode):
+    # Equals
+    @property
+    def my_opcode(self):
+        return 8
+    
+    def operation(self):
+        if self.param_1 == self.param_2:
+            output = 1
+        else:
+            output = 0
+        self.set_value(self.write_param_3, output)
+        self.position += 4
+    
+class OpCode9(OpCode):
+    # Relative Base Modification
+    @property
+    def my_opcode(self):
+        return 9
+    
+    def operation(self):
+        self.relative_base += self.param_1
+        self.position += 2
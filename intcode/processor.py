@@ -0,0 +1,712 @@
+import bisect
+from collections import deque
+import json
+
+from .memory import Channel, PagedMemory
+from .opcodes import OpCode1, OpCode2, OpCode3, OpCode4, OpCode5, OpCode6, OpCode7, OpCode8, OpCode9, OpCode99
+from .profile import Profile
+
+class Recording:
+    # Every input a processor is given, logged against the instruction count
+    # it was queued at, plus a snapshot every `interval` instructions. Any
+    # point of the run can be rebuilt with seek() from the nearest snapshot.
+    def __init__(self, processor, interval=10000):
+        self.processor = processor
+        self.interval = interval
+        self.instructions = 0
+        # (instruction count, value)
+        self.inputs = []
+        # (instruction count, snapshot)
+        self.checkpoints = []
+        # Inputs already logged that are still queued on the processor
+        self.queued = 0
+
+    def checkpoint(self):
+        snapshot = self.processor.snapshot()
+        snapshot.profile = None
+        self.checkpoints.append((self.instructions, snapshot))
+
+    def log_inputs(self):
+        inputs = self.processor.inputs
+        if not self.checkpoints:
+            # Inputs the machine was built with are part of the first snapshot
+            self.checkpoint()
+            self.queued = len(inputs)
+        for value in list(inputs)[self.queued:]:
+            self.inputs.append((self.instructions, value))
+        self.queued = len(inputs)
+
+    def tick(self):
+        self.instructions += 1
+        if self.instructions % self.interval == 0:
+            self.checkpoint()
+
+    def advance(self, instructions):
+        # Steps the live processor until it has run `instructions` in total
+        while self.instructions < instructions:
+            opcode = self.processor.step()
+            if opcode is None:
+                break
+            self.tick()
+            if opcode == 99:
+                break
+        self.queued = len(self.processor.inputs)
+
+    def seek(self, instructions):
+        # A new processor as the recorded one stood after `instructions`
+        # instructions, replayed forward from the closest earlier checkpoint
+        index = bisect.bisect_right([count for count, _ in self.checkpoints], instructions) - 1
+        count, snapshot = self.checkpoints[index]
+        processor = snapshot.fork()
+        pending = deque([(queued_at, value) for queued_at, value in self.inputs if queued_at >= count])
+        while count < instructions:
+            while pending and pending[0][0] <= count:
+                processor.inputs.append(pending.popleft()[1])
+            opcode = processor.step()
+            if opcode is None or opcode == 99:
+                break
+            count += 1
+        return processor
+
+    def save(self, path):
+        with open(path, "w") as f:
+            start = self.checkpoints[0][1]
+            json.dump({
+                "program": list(start.opcodes),
+                # Inputs the machine was built with are in the first
+                # snapshot, not the log
+                "initial_inputs": list(start.inputs),
+                "interval": self.interval,
+                "inputs": self.inputs,
+            }, f)
+
+    @classmethod
+    def load(cls, path, processor=None):
+        # Replays a saved log into a new recording processor, stopping once
+        # its last input has been queued
+        with open(path) as f:
+            saved = json.load(f)
+        processor = (processor or OpCodeProcessor)(saved["program"], inputs=saved.get("initial_inputs", ()), record=saved["interval"])
+        recording = processor.recording
+        recording.log_inputs()
+        for queued_at, value in saved["inputs"]:
+            recording.advance(queued_at)
+            processor.inputs.append(value)
+            recording.log_inputs()
+        return recording
+
+class OpCodeProcessor:
+    opcode_runners = {
+        1: OpCode1,
+        2: OpCode2,
+        3: OpCode3,
+        4: OpCode4,
+        5: OpCode5,
+        6: OpCode6,
+        7: OpCode7,
+        8: OpCode8,
+        9: OpCode9,
+        99: OpCode99
+    }
+    # Index of the parameter each opcode writes to
+    write_params = {
+        1: 2,
+        2: 2,
+        3: 0,
+        7: 2,
+        8: 2
+    }
+    # code word -> decoded entry, shared by every machine; a word always
+    # decodes the same way wherever it sits
+    decoded_words = {}
+    # First word of each idiom run() executes as one superinstruction ->
+    # the method that builds its fused entry
+    fusions = {
+        1001: "fuse_increment",
+        1007: "fuse_compare",
+        1008: "fuse_compare",
+        21101: "fuse_call",
+        21102: "fuse_call",
+        109: "fuse_return"
+    }
+    # Fused entry opcode -> name in the profile
+    fused_names = {
+        100: "increment",
+        101: "compare_jump",
+        102: "call",
+        103: "return"
+    }
+    def __init__(self, opcodes, inputs=(), interactive=False, profile=False, record=None, **kwargs):
+        self.position = 0
+        self.memory = PagedMemory(opcodes.copy())
+        self.kwargs = kwargs
+        self.inputs = Channel(inputs)
+        self.complete = False
+        self.interactive = interactive
+        self.outputs = Channel()
+        self.relative_base = 0
+        # Set when the last run paused for an input
+        self.waiting = False
+        # Instruction counts, only gathered when asked for
+        self.profile = Profile() if profile else None
+        # Input log and checkpoints, taken every `record` instructions
+        self.recording = Recording(self, record) if record else None
+        # position -> (opcode, mode_1, mode_2, mode_3), dropped on write.
+        # run() also keeps fused entries here, (fused opcode, operands,
+        # None, None), which step() decodes past.
+        self.decoded = {}
+        # address -> starts of the fused entries that baked in its value, as
+        # a tuple so forks can share the values
+        self.fused_cover = {}
+
+    @property
+    def opcodes(self):
+        return self.memory.dense
+
+    @opcodes.setter
+    def opcodes(self, opcodes):
+        self.memory.dense = opcodes
+
+    def fork(self):
+        # Copy of a paused machine. Memory is shared until written, and the
+        # program list is then copied whole (pages only as touched), so a
+        # fork costs about one opcodes.copy() plus the decode caches.
+        # A profile stays shared so work done in forks is counted too.
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.recording = None
+        clone.memory = self.memory.fork()
+        clone.inputs = Channel(self.inputs)
+        clone.outputs = Channel(self.outputs)
+        clone.decoded = dict(self.decoded)
+        clone.fused_cover = dict(self.fused_cover)
+        return clone
+
+    def snapshot(self):
+        # A fork that is kept paused to restore() from later
+        return self.fork()
+
+    def restore(self, snapshot):
+        self.memory.release()
+        self.memory = snapshot.memory.fork()
+        self.position = snapshot.position
+        self.relative_base = snapshot.relative_base
+        self.complete = snapshot.complete
+        self.inputs.clear()
+        self.inputs.extend(snapshot.inputs)
+        self.outputs.clear()
+        self.outputs.extend(snapshot.outputs)
+        self.decoded = dict(snapshot.decoded)
+        self.fused_cover = dict(snapshot.fused_cover)
+
+    def stream(self, group=1):
+        # Yields outputs as they are produced, or tuples of `group` outputs,
+        # and None whenever the machine is waiting for an input. A value
+        # passed to send() is queued as the next input.
+        outputs = self.outputs
+        while True:
+            if len(outputs) >= group:
+                if group == 1:
+                    record = outputs.popleft()
+                else:
+                    record = tuple([outputs.popleft() for _ in range(group)])
+            elif self.complete:
+                return
+            else:
+                self.run(until_outputs=group)
+                if len(outputs) >= group:
+                    continue
+                if not self.waiting:
+                    # Halted, or ran off the end of memory
+                    return
+                record = None
+            value = yield record
+            if value is not None:
+                self.inputs.append(value)
+
+    def decode(self, position):
+        code = self.opcodes[position]
+        entry = self.decoded_words.get(code)
+        if entry is None:
+            entry = self.decoded_words[code] = self.decode_word(code, position)
+        self.decoded[position] = entry
+        return entry
+
+    def decode_word(self, code, position):
+        opcode = code % 100
+        if opcode not in self.opcode_runners:
+            print(f"Position {position} with opcodes {self.opcodes}")
+            raise Exception("Failed to run!")
+        modes = (code // 100 % 10, code // 1000 % 10, code // 10000 % 10)
+        for mode in modes:
+            if mode > 2:
+                raise Exception(f'Mode {mode} not known')
+        if opcode in self.write_params and modes[self.write_params[opcode]] == 1:
+            raise Exception("Cannot write in Immediate mode.")
+        return (opcode,) + modes
+
+    def decode_fused(self, position):
+        # Like decode(), but an idiom starting here gets a fused entry
+        memory = self.opcodes
+        fusion = self.fusions.get(memory[position])
+        fused = getattr(self, fusion)(memory, position) if fusion is not None else None
+        if fused is None:
+            return self.decode(position)
+        entry, span = fused
+        self.decoded[position] = entry
+        cover = self.fused_cover
+        for address in range(position, position + span):
+            starts = cover.get(address, ())
+            if position not in starts:
+                cover[address] = starts + (position,)
+        return entry
+
+    def fuse_increment(self, memory, position):
+        # add [x], k, [x]
+        if position + 4 > len(memory) or memory[position + 1] != memory[position + 3] or memory[position + 1] < 0:
+            return None
+        return (100, (memory[position + 1], memory[position + 2]), None, None), 4
+
+    def fuse_compare(self, memory, position):
+        # lt/eq [a], k, [t] then jnz/jz [t], target
+        if position + 7 > len(memory) or memory[position + 4] not in (1005, 1006):
+            return None
+        a, k, t = memory[position + 1:position + 4]
+        if memory[position + 5] != t or a < 0 or t < 0:
+            return None
+        operands = (memory[position] % 100, a, k, t, memory[position + 4] % 100, memory[position + 6])
+        return (101, operands, None, None), 7
+
+    def fuse_call(self, memory, position):
+        # add/mul x, y, [rb+z] then an unconditional jump to target: pushes
+        # the return address and calls
+        if position + 7 > len(memory) or not self.always_jumps(memory, position + 4, 1105, 1106):
+            return None
+        x, y, offset = memory[position + 1:position + 4]
+        value = x + y if memory[position] == 21101 else x * y
+        return (102, (value, offset, memory[position + 6]), None, None), 7
+
+    def fuse_return(self, memory, position):
+        # arb k then an unconditional jump to [rb+z]
+        if position + 5 > len(memory) or not self.always_jumps(memory, position + 2, 2105, 2106):
+            return None
+        return (103, (memory[position + 1], memory[position + 4]), None, None), 5
+
+    def always_jumps(self, memory, position, if_true, if_false):
+        code, condition = memory[position], memory[position + 1]
+        return (code == if_true and condition != 0) or (code == if_false and condition == 0)
+
+    def unfuse(self, address):
+        # Drops the fused entries built over address
+        for start in self.fused_cover.pop(address, ()):
+            entry = self.decoded.get(start)
+            if entry is not None and entry[0] > 99:
+                del self.decoded[start]
+
+    def set_value(self, position, data):
+        self.memory.write(position, data)
+        if position in self.decoded:
+            del self.decoded[position]
+        if position in self.fused_cover:
+            self.unfuse(position)
+
+    def step(self):
+        # Executes one instruction through the memory API and returns its
+        # opcode, or None if nothing ran (waiting for input or off the end)
+        position = self.position
+        if position >= len(self.opcodes):
+            return None
+        entry = self.decoded.get(position)
+        if entry is None:
+            entry = self.decode(position)
+        elif entry[0] > 99:
+            code = self.opcodes[position]
+            entry = self.decoded_words.get(code) or self.decode_word(code, position)
+        opcode, mode_1, mode_2, mode_3 = entry
+        if opcode == 99:
+            self.complete = True
+        elif opcode == 3:
+            if self.inputs:
+                this_input = int(self.inputs.popleft())
+            elif self.interactive is False:
+                # Pause until re-activated
+                self.waiting = True
+                return None
+            else:
+                this_input = int(input("Program input: "))
+            self.set_value(self._address(1, mode_1), this_input)
+            self.position += 2
+        elif opcode == 4:
+            self.outputs.append(self.memory.read(self._address(1, mode_1)))
+            self.position += 2
+        elif opcode == 9:
+            self.relative_base += self.memory.read(self._address(1, mode_1))
+            self.position += 2
+        else:
+            x = self.memory.read(self._address(1, mode_1))
+            y = self.memory.read(self._address(2, mode_2))
+            if opcode == 5:
+                self.position = y if x != 0 else position + 3
+            elif opcode == 6:
+                self.position = y if x == 0 else position + 3
+            else:
+                if opcode == 1:
+                    value = x + y
+                elif opcode == 2:
+                    value = x * y
+                elif opcode == 7:
+                    value = 1 if x < y else 0
+                else:
+                    value = 1 if x == y else 0
+                self.set_value(self._address(3, mode_3), value)
+                self.position += 4
+        return opcode
+
+    def _address(self, offset, mode):
+        parameter = self.memory.read(self.position + offset)
+        if mode == 0:
+            return parameter
+        if mode == 1:
+            return self.position + offset
+        return self.relative_base + parameter
+
+    def run_stepped(self, until_outputs=None):
+        # Steps one instruction at a time for the profiler and the recorder
+        self.waiting = False
+        profile = self.profile
+        recording = self.recording
+        if recording is not None:
+            recording.log_inputs()
+        try:
+            while True:
+                position = self.position
+                if profile is not None and position < len(self.opcodes):
+                    # What run() would execute from here, to count fused hits
+                    fused = self.decoded.get(position) or self.decode_fused(position)
+                opcode = self.step()
+                if opcode is None:
+                    return
+                if profile is not None:
+                    profile.record(position, opcode, self.position)
+                    if fused[0] > 99:
+                        profile.fused[self.fused_names[fused[0]]] += 1
+                if recording is not None:
+                    recording.tick()
+                if opcode == 99:
+                    return
+                if opcode == 4 and until_outputs and len(self.outputs) >= until_outputs:
+                    return
+        finally:
+            if recording is not None:
+                recording.queued = len(self.inputs)
+
+    def run(self, until_outputs=None):
+        # Tight loop over the raw memory; the OpCode classes are kept for
+        # ReferenceProcessor but are not instantiated here. With
+        # until_outputs set it also pauses once that many outputs are queued.
+        if self.profile is not None or self.recording is not None:
+            return self.run_stepped(until_outputs)
+        self.waiting = False
+        memory = self.memory.writable()
+        decoded = self.decoded
+        decoded_words = self.decoded_words
+        fusions = self.fusions
+        fused_cover = self.fused_cover
+        position = self.position
+        relative_base = self.relative_base
+        inputs = self.inputs
+        outputs = self.outputs
+        read = self.memory.read
+        write = self.memory.write
+        size = len(memory)
+        try:
+            while position < size:
+                entry = decoded.get(position)
+                if entry is None:
+                    code = memory[position]
+                    entry = decoded_words.get(code)
+                    if entry is None or code in fusions:
+                        entry = self.decode_fused(position)
+                    else:
+                        decoded[position] = entry
+                opcode, mode_1, mode_2, mode_3 = entry
+                if opcode > 99:
+                    # Fused idioms; mode_1 holds the operands baked in. A
+                    # write that lands on fused code leaves the jump half
+                    # to be decoded afresh.
+                    if opcode == 103:
+                        step, offset = mode_1
+                        relative_base += step
+                        target = relative_base + offset
+                        position = memory[target] if target < size else read(target)
+                        continue
+                    if opcode == 101:
+                        compare, a, k, target, jump, destination = mode_1
+                        x = memory[a] if a < size else read(a)
+                        if compare == 7:
+                            value = 1 if x < k else 0
+                        else:
+                            value = 1 if x == k else 0
+                        position += 4
+                    elif opcode == 102:
+                        value, offset, destination = mode_1
+                        target = relative_base + offset
+                        jump = None
+                        position += 4
+                    else:
+                        target, k = mode_1
+                        value = (memory[target] if target < size else read(target)) + k
+                        jump = None
+                        position += 4
+                    if target < size:
+                        memory[target] = value
+                    else:
+                        write(target, value)
+                        size = len(memory)
+                    if target in decoded:
+                        del decoded[target]
+                    if target in fused_cover:
+                        self.unfuse(target)
+                        continue
+                    if opcode == 102:
+                        position = destination
+                    elif jump == 5:
+                        position = destination if value != 0 else position + 3
+                    elif jump == 6:
+                        position = destination if value == 0 else position + 3
+                    continue
+                if opcode == 99:
+                    self.complete = True
+                    return
+                if mode_1 == 0:
+                    first = memory[position + 1]
+                elif mode_1 == 1:
+                    first = position + 1
+                else:
+                    first = relative_base + memory[position + 1]
+                if opcode != 3 and opcode != 4 and opcode != 9:
+                    x = memory[first] if first < size else read(first)
+                    if mode_2 == 0:
+                        second = memory[position + 2]
+                    elif mode_2 == 1:
+                        second = position + 2
+                    else:
+                        second = relative_base + memory[position + 2]
+                    y = memory[second] if second < size else read(second)
+                    if opcode == 5:
+                        position = y if x != 0 else position + 3
+                        continue
+                    if opcode == 6:
+                        position = y if x == 0 else position + 3
+                        continue
+                    if mode_3 == 0:
+                        third = memory[position + 3]
+                    else:
+                        third = relative_base + memory[position + 3]
+                    if opcode == 1:
+                        value = x + y
+                    elif opcode == 2:
+                        value = x * y
+                    elif opcode == 7:
+                        value = 1 if x < y else 0
+                    else:
+                        value = 1 if x == y else 0
+                    if third < size:
+                        memory[third] = value
+                    else:
+                        write(third, value)
+                        size = len(memory)
+                    if third in decoded:
+                        del decoded[third]
+                    if third in fused_cover:
+                        self.unfuse(third)
+                    position += 4
+                    continue
+                if opcode == 3:
+                    if inputs:
+                        this_input = int(inputs.popleft())
+                    elif self.interactive is False:
+                        # Pause until re-activated
+                        self.waiting = True
+                        return
+                    else:
+                        this_input = int(input("Program input: "))
+                    if first < size:
+                        memory[first] = this_input
+                    else:
+                        write(first, this_input)
+                        size = len(memory)
+                    if first in decoded:
+                        del decoded[first]
+                    if first in fused_cover:
+                        self.unfuse(first)
+                    position += 2
+                    continue
+                if opcode == 4:
+                    outputs.append(memory[first] if first < size else read(first))
+                    position += 2
+                    if until_outputs and len(outputs) >= until_outputs:
+                        return
+                    continue
+                relative_base += memory[first] if first < size else read(first)
+                position += 2
+        finally:
+            self.position = position
+            self.relative_base = relative_base
+
+class ReferenceProcessor(OpCodeProcessor):
+    # Original engine: one OpCode object per executed instruction.
+    # Nothing is fused, so a profile counts the instructions as written.
+    fusions = {}
+
+    def step(self):
+        if self.position >= len(self.opcodes):
+            return None
+        # The OpCode objects write straight into the dense list, so it must
+        # not be one still shared with a fork or snapshot
+        opcodes = self.memory.writable()
+        code = opcodes[self.position]
+        if code % 100 not in self.opcode_runners:
+            print(f"Position {self.position} with opcodes {opcodes}")
+            raise Exception("Failed to run!")
+        runner = self.opcode_runners[code % 100]
+        if runner.takes_input and self.inputs:
+            op = runner(opcodes, self.position, input=self.inputs.popleft(), relative_base=self.relative_base)
+        elif runner.takes_input and self.interactive is False:
+            # Pause until re-activated
+            self.waiting = True
+            return None
+        else:
+            op = runner(opcodes, self.position, relative_base=self.relative_base)
+        op.run()
+        self.opcodes = op.opcodes
+        self.position = op.position
+        self.relative_base = op.relative_base
+        if op.output is not None:
+            self.outputs.append(op.output)
+        if op.should_continue is False:
+            self.complete = True
+        return code % 100
+
+    def run(self, until_outputs=None):
+        if self.profile is not None or self.recording is not None:
+            return self.run_stepped(until_outputs)
+        self.waiting = False
+        while True:
+            opcode = self.step()
+            if opcode is None or opcode == 99:
+                return
+            if opcode == 4 and until_outputs and len(self.outputs) >= until_outputs:
+                return
+
+class ImmediateProcessor(OpCodeProcessor):
+    def __init__(self, opcodes, **kwargs):
+        super().__init__(opcodes, **kwargs)
+        self.run()
+
+
+def test_fusion():
+    count_to_five = [1001,20,1,20,1007,20,5,21,1005,21,0,4,20,99]
+    runner = ImmediateProcessor(count_to_five)
+    assert runner.outputs == [5]
+    assert runner.decoded[0][0] == 100 and runner.decoded[4][0] == 101
+    profiled = ImmediateProcessor(count_to_five, profile=True)
+    assert profiled.profile.fused == {"increment": 5, "compare_jump": 5}
+    assert "compare_jump" in profiled.profile.table()
+    call = [109,30,21101,9,0,0,1105,1,12,99,0,0,104,7,109,0,2106,0,0]
+    runner = ImmediateProcessor(call)
+    assert runner.outputs == [7]
+    assert runner.decoded[2][0] == 102 and runner.decoded[14][0] == 103
+    # The jump's baked target is rewritten after the pair was fused
+    runner = OpCodeProcessor([1008,30,0,31,1005,31,11,104,7,99,0,104,1,1101,0,7,6,1105,1,0])
+    runner.run(until_outputs=2)
+    assert runner.outputs == [1, 7]
+    # The compare writes over the operand its own jump reads
+    for engine in (OpCodeProcessor, ReferenceProcessor):
+        runner = engine([1008,8,7,5,1005,5,10,104,0,99,104,1,99])
+        runner.run()
+        assert runner.outputs == [1]
+
+def test_reference_snapshot():
+    runner = ReferenceProcessor([3,20,1001,20,1,20,4,20,3,20,4,20,99], inputs=[5])
+    runner.run()
+    snapshot = runner.snapshot()
+    runner.inputs.append(9)
+    runner.run()
+    assert runner.outputs == [6, 9] and runner.complete
+    assert snapshot.memory.read(20) == 6
+    runner.restore(snapshot)
+    runner.inputs.append(7)
+    runner.run()
+    assert runner.outputs == [6, 7]
+
+def test_reference_profile_and_record():
+    quine = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+    profiled = ReferenceProcessor(quine, profile=True)
+    profiled.run()
+    expected = OpCodeProcessor(quine, profile=True)
+    expected.run()
+    assert profiled.outputs == quine
+    assert profiled.profile.instructions == expected.profile.instructions
+    assert not profiled.profile.fused
+    recorded = ReferenceProcessor(quine, record=10)
+    recorded.run()
+    assert recorded.outputs == quine
+    assert len(recorded.recording.checkpoints) > 1
+    assert recorded.recording.seek(recorded.recording.instructions).outputs == quine
+
+def test_reference_engine():
+    input_1 = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+    reference = ReferenceProcessor(input_1)
+    reference.run()
+    assert ImmediateProcessor(input_1).outputs == reference.outputs == input_1
+    assert reference.complete
+
+def test_decode_cache():
+    runner = OpCodeProcessor([104,5,99,0,0,7])
+    runner.run()
+    assert runner.decoded[0] == (4, 1, 0, 0)
+    runner.set_value(0, 4)
+    assert 0 not in runner.decoded
+    runner.position = 0
+    runner.run()
+    assert runner.outputs == [5, 7]
+
+def test_channels():
+    first = OpCodeProcessor([3,0,99])
+    second = OpCodeProcessor([3,0,99])
+    first.inputs.append(1)
+    assert second.inputs == []
+    runner = ImmediateProcessor([104,1,104,2,104,3,104,4,99])
+    assert list(runner.outputs.read_chunks(3)) == [(1, 2, 3)]
+    assert runner.outputs == [4]
+    assert runner.outputs.drain() == [4]
+    assert runner.outputs == []
+
+def test_stream():
+    runner = OpCodeProcessor([104,1,104,2,3,20,4,20,104,3,99])
+    stream = runner.stream()
+    assert next(stream) == 1
+    assert len(runner.outputs) == 0
+    assert next(stream) == 2
+    assert next(stream) is None
+    assert stream.send(7) == 7
+    assert list(stream) == [3]
+    robot = OpCodeProcessor([3,100,104,1,104,0,3,100,4,100,104,1,99])
+    stream = robot.stream(2)
+    assert next(stream) is None
+    assert stream.send(0) == (1, 0)
+    assert next(stream) is None
+    assert stream.send(5) == (5, 1)
+    assert list(stream) == []
+
+def test_recording_initial_inputs(tmp_path):
+    runner = OpCodeProcessor([3,20,3,21,1,20,21,22,4,22,99], inputs=[5], record=2)
+    runner.run()
+    runner.inputs.append(7)
+    runner.run()
+    assert runner.outputs == [12]
+    runner.recording.save(tmp_path / "session.json")
+    replayed = Recording.load(tmp_path / "session.json").processor
+    replayed.run()
+    assert replayed.outputs == [12] and replayed.complete
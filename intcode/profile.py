@@ -0,0 +1,114 @@
+from collections import Counter
+import marshal
+
+class Profile:
+    # Counts gathered while a processor runs with profile=True. Blocks are
+    # straight-line runs as CompiledProcessor sees them, keyed by the address
+    # they were entered at.
+    block_ends = (3, 4, 5, 6, 99)
+    def __init__(self):
+        self.instructions = 0
+        self.opcodes = Counter()
+        self.addresses = Counter()
+        # block start -> times entered / instructions executed inside it
+        self.blocks = Counter()
+        self.block_instructions = Counter()
+        # (jump address, target) -> times taken
+        self.jumps = Counter()
+        # (previous block, next block) -> times control flowed between them
+        self.edges = Counter()
+        # fused idiom -> times run() would have run it as one instruction
+        self.fused = Counter()
+        self.block = None
+        self.previous_block = None
+
+    def record(self, position, opcode, next_position):
+        if self.block is None:
+            self.block = position
+            self.blocks[position] += 1
+            self.edges[(self.previous_block, position)] += 1
+        self.instructions += 1
+        self.opcodes[opcode] += 1
+        self.addresses[position] += 1
+        self.block_instructions[self.block] += 1
+        if (opcode == 5 or opcode == 6) and next_position != position + 3:
+            self.jumps[(position, next_position)] += 1
+        if opcode in self.block_ends:
+            self.previous_block = self.block
+            self.block = None
+
+    def table(self, limit=20):
+        total = max(self.instructions, 1)
+        lines = [f"{self.instructions} instructions", "", "opcode      count   share"]
+        for opcode, count in self.opcodes.most_common():
+            lines.append(f"{opcode:>6} {count:>10} {count / total:>7.1%}")
+        lines += ["", "block     entries  instructions   share"]
+        for start, count in self.block_instructions.most_common(limit):
+            lines.append(f"{start:>6} {self.blocks[start]:>10} {count:>13} {count / total:>7.1%}")
+        lines += ["", "address      count   share"]
+        for address, count in self.addresses.most_common(limit):
+            lines.append(f"{address:>7} {count:>10} {count / total:>7.1%}")
+        lines += ["", "fused idiom      hits"]
+        for name, count in self.fused.most_common():
+            lines.append(f"{name:<12} {count:>8}")
+        lines += ["", "jump -> target      taken"]
+        for (address, target), count in self.jumps.most_common(limit):
+            lines.append(f"{address:>6} -> {target:<7} {count:>9}")
+        return "\n".join(lines)
+
+    def collapsed(self):
+        # Folded stacks ("block;address count") for flamegraph.pl/speedscope
+        lines = []
+        for address, count in sorted(self.addresses.items()):
+            lines.append(f"block_{self.block_of(address)};{address} {count}")
+        return "\n".join(lines) + "\n"
+
+    def block_of(self, address):
+        starts = [start for start in self.blocks if start <= address]
+        return max(starts) if starts else address
+
+    def dump_stats(self, path):
+        # pstats-compatible dump: each block is a "function" whose time is
+        # the number of instructions run inside it, and whose callers are
+        # the blocks control came from.
+        def key(start):
+            return ("<intcode>", start, f"block_{start}")
+        stats = {}
+        for start, entries in self.blocks.items():
+            count = self.block_instructions[start]
+            callers = {}
+            for (previous, following), flows in self.edges.items():
+                if following == start and previous is not None:
+                    callers[key(previous)] = (flows, flows, 0, 0)
+            stats[key(start)] = (entries, entries, count, count, callers)
+        with open(path, "wb") as f:
+            marshal.dump(stats, f)
+
+
+def test_profile(tmp_path):
+    import pstats
+    from .compiled import CompiledProcessor
+    from .processor import OpCodeProcessor
+    input_1 = [109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99]
+    runner = OpCodeProcessor(input_1, profile=True)
+    runner.run()
+    assert runner.outputs == input_1
+    profile = runner.profile
+    assert profile.opcodes[4] == 16
+    assert profile.addresses[0] == 16
+    assert profile.jumps[(12, 0)] == 15
+    assert profile.blocks[0] == 16
+    assert profile.instructions == sum(profile.block_instructions.values())
+    assert "block_0;2 16" in profile.collapsed()
+    assert "instructions" in profile.table()
+    profile.dump_stats(tmp_path / "intcode.prof")
+    stats = pstats.Stats(str(tmp_path / "intcode.prof"))
+    assert stats.total_calls == 33
+    assert stats.total_tt == profile.instructions
+    # Profiled runs pause for input like the fast loop
+    runner = CompiledProcessor([3,0,4,0,99], profile=True)
+    runner.run()
+    assert runner.waiting
+    runner.inputs.append(5)
+    runner.run()
+    assert runner.outputs == [5] and runner.complete